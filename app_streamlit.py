@@ -7,10 +7,12 @@ import re
 import configparser
 from pathlib import Path
 import tempfile
+import shutil
 import os
 import altair as alt
 import threading
 import time
+import bps_utils
 
 # Load environment variables from .env file
 try:
@@ -63,6 +65,12 @@ if 'filtered_df' not in st.session_state:
     st.session_state.filtered_df = None
 if 'last_query' not in st.session_state:
     st.session_state.last_query = None
+if 'web_page_cursors' not in st.session_state:
+    st.session_state.web_page_cursors = [None]  # keyset cursor of each visited results page
+if 'web_has_more' not in st.session_state:
+    st.session_state.web_has_more = False
+if 'web_summary' not in st.session_state:
+    st.session_state.web_summary = None
 if 'pdf_articles' not in st.session_state:
     st.session_state.pdf_articles = []
 if 'pdf_filtered_df' not in st.session_state:
@@ -139,207 +147,8 @@ def classify_bps_category(content_text, extracted_category=None):
     if extracted_category:
         analysis_text += str(extracted_category).lower()
 
-    # Enhanced BPS category classification with expanded keywords
-    # A1: Pertanian, Tanaman Pangan, Hortikultura, Perkebunan, Peternakan, Perburuan, Jasa Pertanian
-    if any(word in analysis_text for word in [
-        'pertanian', 'tanaman', 'padi', 'jagung', 'beras', 'palawija', 'hortikultura',
-        'perkebunan', 'sawit', 'kelapa', 'kakao', 'kopi', 'teh', 'cengkeh', 'petani',
-        'panen', 'pupuk', 'bibit', 'kehutanan', 'kayu', 'hutan', 'kehutanan',
-        'peternakan', 'ternak', 'sapi', 'ayam', 'kambing', 'perburuan', 'buruan'
-    ]):
-        return 'A1'
-
-    # A2: Kehutanan dan Penebangan Kayu
-    elif any(word in analysis_text for word in [
-        'kehutanan', 'penebangan', 'kayu', 'hutan', 'rimba', 'hutan lindung',
-        'pengelolaan hutan', 'kayu lapis', 'kayu gergajian'
-    ]):
-        return 'A2'
-
-    # A3: Perikanan
-    elif any(word in analysis_text for word in [
-        'perikanan', 'ikan', 'nelayan', 'laut', 'tambak', 'kolam', 'budidaya ikan',
-        'perikanan tangkap', 'udang', 'kepiting', 'cumi', 'gurita'
-    ]):
-        return 'A3'
-
-    # B: Pertambangan dan Penggalian
-    elif any(word in analysis_text for word in [
-        'tambang', 'mining', 'galian', 'minerba', 'emas', 'tembaga', 'nikel',
-        'batubara', 'minyak', 'gas', 'panas bumi', 'pertambangan', 'miner'
-    ]):
-        return 'B'
-
-    # C1: Industri Makanan dan Minuman
-    elif any(word in analysis_text for word in [
-        'makanan', 'minuman', 'kuliner', 'mamin', 'industri makanan', 'pengolahan makanan',
-        'roti', 'kue', 'susu', 'keju', 'yogurt', 'minuman ringan', 'jus', 'teh botol'
-    ]):
-        return 'C1'
-
-    # C2: Industri Pengolahan
-    elif any(word in analysis_text for word in [
-        'industri', 'pengolahan', 'manufaktur', 'pabrik', 'produksi', 'industri kimia',
-        'industri logam', 'industri plastik', 'industri karet', 'industri semen'
-    ]):
-        return 'C2'
-
-    # C3: Industri Tekstil dan Pakaian Jadi
-    elif any(word in analysis_text for word in [
-        'tekstil', 'pakaian', 'konveksi', 'garmen', 'baju', 'kaos', 'celana',
-        'kain', 'benang', 'spinning', 'weaving', 'garment'
-    ]):
-        return 'C3'
-
-    # C4: Industri Elektronika
-    elif any(word in analysis_text for word in [
-        'elektronik', 'teknologi', 'gadget', 'komputer', 'handphone', 'hp', 'smartphone',
-        'laptop', 'elektronika', 'semikonduktor', 'chip', 'elektronik konsumen'
-    ]):
-        return 'C4'
-
-    # C5: Industri Kertas/barang dari Kertas
-    elif any(word in analysis_text for word in [
-        'kertas', 'printing', 'media', 'publikasi', 'koran', 'majalah', 'buku',
-        'karton', 'tisu', 'printing press', 'percetakan'
-    ]):
-        return 'C5'
-
-    # D: Pengadaan Listrik, Gas
-    elif any(word in analysis_text for word in [
-        'listrik', 'gas', 'energi', 'pln', 'kelistrikan', 'pembangkit', 'transmisi',
-        'distribusi', 'tenaga listrik', 'gas alam', 'lng'
-    ]):
-        return 'D'
-
-    # E: Pengadaan Air
-    elif any(word in analysis_text for word in [
-        'air', 'sanitasi', 'pdam', 'bersih', 'pengolahan air', 'air minum',
-        'sanitasi lingkungan', 'drainase', 'pengelolaan air'
-    ]):
-        return 'E'
-
-    # F: Konstruksi
-    elif any(word in analysis_text for word in [
-        'konstruksi', 'bangunan', 'jalan', 'infrastruktur', 'jembatan', 'gedung',
-        'proyek konstruksi', 'developer', 'kontraktor', 'sipil'
-    ]):
-        return 'F'
-
-    # G1: Perdagangan, Reparasi dan Perawatan Mobil dan Sepeda Motor
-    elif any(word in analysis_text for word in [
-        'otomotif', 'mobil', 'motor', 'sepeda motor', 'dealer', 'showroom',
-        'bengkel', 'reparasi', 'service', 'sparepart', 'aksesoris kendaraan'
-    ]):
-        return 'G1'
-
-    # G2: Perdagangan Eceran Berbagai Macam Barang di Toko, Supermarket/Minimarket
-    elif any(word in analysis_text for word in [
-        'toko', 'supermarket', 'minimarket', 'retail', 'eceran', 'department store',
-        'mall', 'pusat perbelanjaan', 'ritel modern'
-    ]):
-        return 'G2'
-
-    # G3: Perdagangan Eceran Kaki Lima dan Los Pasar
-    elif any(word in analysis_text for word in [
-        'los pasar', 'kaki lima', 'pedagang', 'pasar tradisional', 'warung',
-        'pedagang keliling', 'pasar rakyat', 'retail tradisional'
-    ]):
-        return 'G3'
-
-    # H1: Angkutan Darat
-    elif any(word in analysis_text for word in [
-        'darat', 'bus', 'angkot', 'transportasi', 'angkutan', 'logistik', 'trucking',
-        'ekspedisi', 'kurir', 'delivery', 'ojek', 'taxi', 'angkot'
-    ]):
-        return 'H1'
-
-    # H2: Angkutan Laut
-    elif any(word in analysis_text for word in [
-        'laut', 'kapal', 'pelabuhan', 'maritim', 'shipping', 'kontainer',
-        'barang laut', 'perkapalan', 'pelayaran', 'marina'
-    ]):
-        return 'H2'
-    # H3: Angkutan Udara
-    elif any(word in analysis_text for word in [
-        'udara', 'pesawat', 'bandara', 'aviasi', 'penerbangan', 'airport',
-        'maskapai', 'airline', 'cargo udara', 'angkutan udara'
-    ]):
-        return 'H3'
-
-    # I1: Akomodasi Hotel dan Pondok Wisata
-    elif any(word in analysis_text for word in [
-        'hotel', 'wisata', 'akomodasi', 'hospitality', 'penginapan', 'villa',
-        'resort', 'homestay', 'pondok wisata', 'pariwisata'
-    ]):
-        return 'I1'
-
-    # I2: Penyediaan Makanan dan Minuman (Kedai, Restoran, dsb)
-    elif any(word in analysis_text for word in [
-        'restoran', 'kedai', 'makan', 'fnb', 'food and beverage', 'kafe',
-        'warung makan', 'rumah makan', 'food court', 'kuliner'
-    ]):
-        return 'I2'
-
-    # J: Informasi dan Komunikasi
-    elif any(word in analysis_text for word in [
-        'komunikasi', 'internet', 'telekomunikasi', 'telekom', 'telepon',
-        'seluler', 'provider', 'operator', 'broadband', 'fiber optik'
-    ]):
-        return 'J'
-
-    # K: Jasa Keuangan
-    elif any(word in analysis_text for word in [
-        'keuangan', 'bank', 'asuransi', 'finance', 'perbankan', 'leasing',
-        'kredit', 'pinjaman', 'tabungan', 'investasi', 'sekuritas'
-    ]):
-        return 'K'
-
-    # L: Real Estate
-    elif any(word in analysis_text for word in [
-        'real estate', 'properti', 'perumahan', 'developer', 'real estat',
-        'property', 'apartemen', 'perumahan', 'landed house'
-    ]):
-        return 'L'
-
-    # MN: Jasa Perusahaan
-    elif any(word in analysis_text for word in [
-        'perusahaan', 'bisnis', 'jasa', 'korporasi', 'konsultan', 'akuntan',
-        'legal', 'hukum', 'notaris', 'management consultant'
-    ]):
-        return 'MN'
-
-    # O: Administrasi Pemerintahan, Pertahanan dan Jaminan Sosial Wajib
-    elif any(word in analysis_text for word in [
-        'pemerintah', 'pemda', 'bupati', 'dinas', 'kementerian', 'pemerintah daerah',
-        'administrasi', 'birokrasi', 'pelayanan publik', 'pemerintahan'
-    ]):
-        return 'O'
-
-    # P: Jasa Pendidikan
-    elif any(word in analysis_text for word in [
-        'pendidikan', 'sekolah', 'siswa', 'guru', 'universitas', 'kampus',
-        'pendidikan tinggi', 'sd', 'smp', 'sma', 'smk', 'kursus', 'pelatihan'
-    ]):
-        return 'P'
-
-    # Q: Jasa Kesehatan dan Kegiatan Sosial
-    elif any(word in analysis_text for word in [
-        'kesehatan', 'rumah sakit', 'dokter', 'medis', 'klinik', 'puskesmas',
-        'bidan', 'perawat', 'farmasi', 'apotek', 'rs', 'hospital'
-    ]):
-        return 'Q'
-
-    # RSTU: Jasa lainnya
-    elif any(word in analysis_text for word in [
-        'jasa', 'servis', 'bisnis', 'usaha', 'konsultasi', 'perdagangan',
-        'entertainment', 'hiburan', 'olahraga', 'seni', 'budaya'
-    ]):
-        return 'RSTU'
-
-    # Default fallback
-    else:
-        return 'UMUM'
+    # Keyword rules live in bps_utils so the SQL-side classification stays identical
+    return bps_utils.classify_text(analysis_text)
 
 
 # Backward compatibility
@@ -364,6 +173,11 @@ except ImportError:
     st.error("❌ pymysql package not found. Please install with: pip install pymysql")
     st.stop()
 
+import db_utils
+import export_utils
+import parquet_archive
+import web_match
+
 # Azure OpenAI config placeholder (will be updated after reading config.ini)
 azure_config = {
     "endpoint": "",
@@ -374,7 +188,7 @@ azure_config = {
 
 # Import langchain extract functionality
 try:
-    from langchain_extract import NewspaperExtractor
+    from langchain_extract import NewspaperExtractor, PdfArticleStore, TokenUsage
     LANGCHAIN_AVAILABLE = True
 
 except ImportError as e:
@@ -476,6 +290,28 @@ def halaman_to_numeric(halaman_val):
     except (ValueError, AttributeError):
         return 1  # Default fallback
 
+# Columns that repeat a handful of labels across many rows
+CATEGORY_COLUMNS = ['sources', 'bps_category', 'bps_category_name', 'kategori', 'sumber', 'source_file']
+CONTENT_PREVIEW_CHARS = 200  # konten shown in the results table
+RESULT_TABLE_COLUMNS = ['date', 'title', 'sources', 'bps_category', 'bps_category_name']  # web results index view
+
+def compact_frame(df):
+    """Categorical dtypes for label columns and datetime64 dates, so frames kept in session state stay small"""
+    if df is None or df.empty:
+        return df
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    if 'date' in df.columns:
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    return df
+
+def preview_frame(df):
+    """Display copy of a PDF results frame with konten truncated (the stored frame keeps full text)"""
+    if 'konten' not in df.columns:
+        return df
+    return df.assign(konten=df['konten'].str.slice(0, CONTENT_PREVIEW_CHARS))
+
 # Database configuration (environment variables first, config.ini as fallback)
 db_config = {
     "host": os.getenv("DB_HOST", config.get("DEFAULT", "DB_HOST", fallback="localhost")),
@@ -486,13 +322,30 @@ db_config = {
     "cursorclass": pymysql.cursors.DictCursor
 }
 
+# Analytics backend for the search summary and charts: "mysql" or "duckdb" (Parquet archive)
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", config.get("DEFAULT", "ANALYTICS_BACKEND", fallback="mysql")).lower()
+PARQUET_ARCHIVE_DIR = os.getenv("PARQUET_ARCHIVE_DIR", config.get("DEFAULT", "PARQUET_ARCHIVE_DIR", fallback=parquet_archive.ARCHIVE_DIR))
+
+# Cross-check PDF pages against news_articles before sending them to the LLM
+PDF_WEB_MATCH = os.getenv("PDF_WEB_MATCH", config.get("DEFAULT", "PDF_WEB_MATCH", fallback="true")).lower() == "true"
+# Keep extracted PDF articles in pdf_articles and reuse editions extracted before
+PDF_STORE_ARTICLES = os.getenv(
+    "PDF_STORE_ARTICLES", config.get("DEFAULT", "PDF_STORE_ARTICLES", fallback="true")
+).lower() == "true"
+
 # Azure OpenAI configuration for AI-powered features
 # Environment variables first, config.ini as fallback for development
 azure_config.update({
     "endpoint": os.getenv("AZURE_OPENAI_ENDPOINT", config.get("DEFAULT", "AZURE_OPENAI_ENDPOINT", fallback="")),
     "api_key": os.getenv("AZURE_OPENAI_API_KEY", config.get("DEFAULT", "AZURE_OPENAI_API_KEY", fallback="")),
     "api_version": os.getenv("AZURE_OPENAI_API_VERSION", config.get("DEFAULT", "AZURE_OPENAI_API_VERSION", fallback="2024-12-01-preview")),
-    "deployment_name": os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", config.get("DEFAULT", "AZURE_OPENAI_DEPLOYMENT_NAME", fallback="gpt-4o"))
+    "deployment_name": os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", config.get("DEFAULT", "AZURE_OPENAI_DEPLOYMENT_NAME", fallback="gpt-4o")),
+    "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", config.get("DEFAULT", "LLM_MAX_CONCURRENCY", fallback="4"))),
+    "token_limit": int(os.getenv("OLLAMA_TOKEN_LIMIT", config.get("DEFAULT", "OLLAMA_TOKEN_LIMIT", fallback="16000"))),
+    "token_safety_ratio": float(os.getenv("TOKEN_SAFETY_RATIO", config.get("DEFAULT", "TOKEN_SAFETY_RATIO", fallback="0.90"))),
+    "backend": os.getenv("LLM_BACKEND", config.get("DEFAULT", "LLM_BACKEND", fallback="azure")).lower(),
+    "ollama_url": os.getenv("OLLAMA_URL", config.get("DEFAULT", "OLLAMA_URL", fallback="")),
+    "ollama_model": os.getenv("OLLAMA_MODEL", config.get("DEFAULT", "OLLAMA_MODEL", fallback="qwen3:4b-instruct"))
 })
 
 # Check Azure OpenAI configuration after config is loaded
@@ -506,6 +359,9 @@ if LANGCHAIN_AVAILABLE:
         and azure_config["endpoint"] != "https://your-azure-openai-endpoint.openai.azure.com/"
         and azure_config["api_key"] != "your-azure-openai-api-key"
     )
+    # With the Ollama backend the PDF features only need the Ollama endpoint
+    if azure_config["backend"] == "ollama":
+        AZURE_OPENAI_AVAILABLE = bool(azure_config["ollama_url"])
 
 def show_connection_error(error_code, error_msg, host):
     """Show user-friendly connection error messages with solutions."""
@@ -551,26 +407,22 @@ DB_NAME = your_database_name
             st.code(f"Error: {error_msg}")
             st.info("💡 **Tip:** Check MySQL logs for more detailed error information")
 
+@st.cache_resource
+def get_db_pool():
+    """Connection pool shared by all sessions of this Streamlit server."""
+    db_config_with_timeout = db_config.copy()
+    db_config_with_timeout.update({
+        'connect_timeout': 10,  # 10 second timeout
+        'read_timeout': 10,
+        'write_timeout': 10,
+    })
+    return db_utils.ConnectionPool(db_config_with_timeout)
+
 def get_mysql_conn():
-    """Get MySQL database connection with enhanced error handling."""
+    """Get a pooled MySQL connection with enhanced error handling; close() returns it to the pool."""
     try:
-        # Add connection timeout and retry logic
-        db_config_with_timeout = db_config.copy()
-        db_config_with_timeout.update({
-            'connect_timeout': 10,  # 10 second timeout
-            'read_timeout': 10,
-            'write_timeout': 10,
-        })
-
-        conn = pymysql.connect(**db_config_with_timeout)
-
-        # Test the connection
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1 as test")
-        cursor.fetchone()
-        cursor.close()
-
-        return conn
+        # Connections idle for a while are pinged on checkout, fresh ones are used directly
+        return get_db_pool().connection()
 
     except pymysql.err.OperationalError as e:
         error_code = e.args[0] if e.args else None
@@ -587,6 +439,39 @@ def get_mysql_conn():
             st.info("💡 **Tip:** This might be a configuration or network issue")
         return None
 
+# Database connection helper
+@st.cache_data(ttl=600, show_spinner=False)  # Cache for 10 minutes, no spinner
+def get_database_stats():
+    """Get basic statistics from the daily_source_stats rollup (a few dozen rows, no full scan)."""
+    conn = get_mysql_conn()
+    if not conn:
+        return {"total_articles": 0, "date_range": "No connection", "sources": {}, "latest_date": None}
+
+    try:
+        stats = db_utils.get_overview_stats(conn)
+        conn.close()
+
+        # Format dates to short string
+        def _fmt_date(d):
+            if d is None:
+                return None
+            return d.strftime("%Y-%m-%d") if hasattr(d, "strftime") else str(d)
+        date_min_fmt, date_max_fmt = _fmt_date(stats["min_date"]), _fmt_date(stats["latest_date"])
+
+        return {
+            "total_articles": stats["total_articles"],
+            "date_range": f"{date_min_fmt} to {date_max_fmt}" if date_min_fmt else "No data",
+            "sources": stats["sources"],
+            "latest_date": stats["latest_date"]
+        }
+    except Exception as e:
+        if conn:
+            try:
+                conn.close()
+            except:
+                pass
+        return {"total_articles": 0, "date_range": f"Error: {str(e)}", "sources": {}, "latest_date": None}
+
 st.set_page_config(
     page_title="News Scraper - BPS Gorontalo",
     page_icon="📰",
@@ -855,24 +740,9 @@ try:
                 st.markdown('</div>', unsafe_allow_html=True)
             with col4:
                 st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-                # Get latest date
-                try:
-                    conn = get_mysql_conn()
-                    if conn:
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT MAX(date) AS latest_date FROM news_articles")
-                        latest_row = cursor.fetchone() or {}
-                        latest_raw = latest_row.get("latest_date")
-                        if hasattr(latest_raw, "strftime"):
-                            latest_date = latest_raw.strftime("%Y-%m-%d")
-                        else:
-                            latest_date = str(latest_raw) if latest_raw else "N/A"
-                        cursor.close()
-                        conn.close()
-                    else:
-                        latest_date = "N/A"
-                except:
-                    latest_date = "Error"
+                # Latest date comes with the cached overview stats
+                latest_raw = db_stats.get("latest_date")
+                latest_date = latest_raw.strftime("%Y-%m-%d") if hasattr(latest_raw, "strftime") else "N/A"
                 st.metric("🕒 Last Updated", latest_date)
                 st.markdown('</div>', unsafe_allow_html=True)
         else:
@@ -894,24 +764,9 @@ try:
                 st.markdown('</div>', unsafe_allow_html=True)
             with col4:
                 st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-                # Get latest date
-                try:
-                    conn = get_mysql_conn()
-                    if conn:
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT MAX(date) AS latest_date FROM news_articles")
-                        latest_row = cursor.fetchone() or {}
-                        latest_raw = latest_row.get("latest_date")
-                        if hasattr(latest_raw, "strftime"):
-                            latest_date = latest_raw.strftime("%Y-%m-%d")
-                        else:
-                            latest_date = str(latest_raw) if latest_raw else "N/A"
-                        cursor.close()
-                        conn.close()
-                    else:
-                        latest_date = "N/A"
-                except:
-                    latest_date = "Error"
+                # Latest date comes with the cached overview stats
+                latest_raw = db_stats.get("latest_date")
+                latest_date = latest_raw.strftime("%Y-%m-%d") if hasattr(latest_raw, "strftime") else "N/A"
                 st.metric("🕒 Last Updated", latest_date)
                 st.markdown('</div>', unsafe_allow_html=True)
 except:
@@ -960,54 +815,6 @@ if st.session_state.scraper_mode == "Web Scraper":
 elif st.session_state.scraper_mode == "PDF Scraper":
     st.markdown("📄 **PDF Scraper Mode**: Extract and analyze articles from PDF newspapers.")
 
-# Database connection helper
-@st.cache_data(ttl=600, show_spinner=False)  # Cache for 10 minutes, no spinner
-def get_database_stats():
-    """Get basic statistics from the database."""
-    conn = get_mysql_conn()
-    if not conn:
-        return {"total_articles": 0, "date_range": "No connection", "sources": {}}
-
-    try:
-        cursor = conn.cursor()
-
-        # Get total articles count
-        cursor.execute("SELECT COUNT(*) AS total_count FROM news_articles")
-        total_row = cursor.fetchone() or {}
-        total_count = total_row.get("total_count", 0)
-
-        # Get date range
-        cursor.execute("SELECT MIN(date) AS min_date, MAX(date) AS max_date FROM news_articles")
-        date_row = cursor.fetchone() or {}
-        date_min, date_max = date_row.get("min_date"), date_row.get("max_date")
-        # Format dates to short string
-        def _fmt_date(d):
-            if d is None:
-                return None
-            return d.strftime("%Y-%m-%d") if hasattr(d, "strftime") else str(d)
-        date_min_fmt, date_max_fmt = _fmt_date(date_min), _fmt_date(date_max)
-
-        # Get source counts (exclude NULL and empty strings)
-        cursor.execute("SELECT sources, COUNT(*) AS cnt FROM news_articles WHERE sources IS NOT NULL AND sources != '' GROUP BY sources")
-        source_rows = cursor.fetchall() or []
-        source_counts = {row.get("sources", "unknown"): row.get("cnt", 0) for row in source_rows if row.get("sources")}
-
-        cursor.close()
-        conn.close()
-
-        return {
-            "total_articles": total_count,
-            "date_range": f"{date_min_fmt} to {date_max_fmt}" if date_min_fmt else "No data",
-            "sources": source_counts
-        }
-    except Exception as e:
-        if conn:
-            try:
-                conn.close()
-            except:
-                pass
-        return {"total_articles": 0, "date_range": f"Error: {str(e)}", "sources": {}}
-
 # Database diagnostics moved to sidebar for better organization
 
 # KBLI Category Reference
@@ -1104,25 +911,10 @@ if st.session_state.scraper_mode == "Web Scraper":
             unique_sources = [s for s in db_stats["sources"].keys() if s and s.strip()]
             st.metric("News Sources", len(unique_sources), help="Total unique news sources in database (excluding empty/NULL)")
         with col4:
-            # Try to get the most recent date
-            try:
-                conn = get_mysql_conn()
-                if conn:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT MAX(date) AS latest_date FROM news_articles")
-                    latest_row = cursor.fetchone() or {}
-                    latest_raw = latest_row.get("latest_date")
-                    if hasattr(latest_raw, "strftime"):
-                        latest_date = latest_raw.strftime("%Y-%m-%d")
-                    else:
-                        latest_date = str(latest_raw) if latest_raw is not None else None
-                    cursor.close()
-                    conn.close()
-                    st.metric("Last Updated", latest_date or "N/A")
-                else:
-                    st.metric("Last Updated", "N/A")
-            except Exception as e:
-                st.metric("Last Updated", "Error")
+            # Most recent date, from the same rollup as the other metrics
+            latest_raw = db_stats.get("latest_date")
+            latest_date = latest_raw.strftime("%Y-%m-%d") if hasattr(latest_raw, "strftime") else None
+            st.metric("Last Updated", latest_date or "N/A")
 
 # Enhanced Sidebar Design
 with st.sidebar:
@@ -1173,6 +965,8 @@ if scraper_mode != st.session_state.scraper_mode:
         st.session_state.query_results = []
         st.session_state.filtered_df = None
         st.session_state.last_query = None
+        st.session_state.web_page_cursors = [None]
+        st.session_state.web_summary = None
     elif old_mode == "PDF Scraper" and scraper_mode == "Web Scraper":
         # Switching FROM PDF TO Web: reset PDF-related states only
         st.session_state.pdf_articles = []
@@ -1237,85 +1031,144 @@ def render_web_scraper_sidebar():
 
         return start_date, end_date, keywords
 
-def process_pdf_file(uploaded_file, keywords=None):
-    """Process uploaded PDF file and extract articles"""
+@st.cache_resource
+def get_pdf_extractor():
+    """One NewspaperExtractor (LLM client and response cache) shared by all sessions"""
+    return NewspaperExtractor(
+        azure_endpoint=azure_config["endpoint"],
+        azure_key=azure_config["api_key"],
+        api_version=azure_config["api_version"],
+        max_concurrency=azure_config["max_concurrency"],
+        token_limit=azure_config["token_limit"],
+        token_safety_ratio=azure_config["token_safety_ratio"],
+        backend=azure_config["backend"],
+        ollama_url=azure_config["ollama_url"] or None,
+        ollama_model=azure_config["ollama_model"],
+        # Skip PDF regions already scraped into news_articles
+        web_matcher=web_match.WebArticleMatcher(get_mysql_conn) if PDF_WEB_MATCH else None,
+        # PDF files already fully extracted are loaded from pdf_articles instead of the LLM
+        article_store=PdfArticleStore(get_mysql_conn) if PDF_STORE_ARTICLES else None
+    )
+
+def filter_pdf_articles(articles_dict, keywords):
+    """Keep articles whose stemmed judul + konten contain one of the keywords"""
+    print(f"[INFO] Applying keyword filtering: {keywords}")
+    factory = StemmerFactory()
+    stemmer = factory.create_stemmer()
+
+    filtered_articles = []
+    keyword_stems = [stemmer.stem(k.lower()) for k in keywords]
+    for article in articles_dict:
+        text_to_search = (article['judul'] + ' ' + article['konten']).lower()
+        cleaned_text = re.sub(r'\s+', ' ', text_to_search) # hapus spasi berlebih
+        cleaned_text = re.sub(r'[^\w\s]', ' ', cleaned_text) # hapus tanda baca
+        words = cleaned_text.split()
+        cleaned_text_stems = [stemmer.stem(w) for w in words]
+        if any(k in cleaned_text_stems for k in keyword_stems):
+            filtered_articles.append(article)
+    print(f"[INFO] After filtering: {len(filtered_articles)} articles remain")
+    return filtered_articles
+
+def pdf_article_dict(article, source_file):
+    """Extractor article -> dict used by the PDF results table"""
+    return {
+        'judul': article.judul,
+        'konten': article.konten,
+        'kategori': article.kategori,
+        'halaman': article.halaman,
+        'sumber': article.sumber,
+        'source_file': source_file,
+        'web_link': getattr(article, 'links', None)
+    }
+
+def process_pdf_files(uploaded_files, keywords=None, on_articles=None):
+    """
+    Extract articles from all uploaded PDFs in one batch.
+
+    Text extraction runs in a process pool and the LLM requests of every file
+    share one bounded concurrent queue. Returns (articles, usage): one list of
+    article dicts and one token usage dict per file.
+
+    on_articles(file_index, articles, done, total) is called every time one
+    chunk finishes, with that chunk's article dicts (keyword-filtered, not yet
+    merged across pages). If extraction fails part way, the articles received
+    so far are returned instead of empty lists.
+
+    PDF files already fully extracted (same file content) are loaded from the database unless
+    "Re-extract stored editions" is ticked in the sidebar.
+    """
+    empty_usage = [{} for _ in uploaded_files]
     if not LANGCHAIN_AVAILABLE:
         st.error("❌ LangChain extraction not available")
-        return []
+        return [[] for _ in uploaded_files], empty_usage
 
     # Reset extraction status at start
     st.session_state.pdf_extraction_status = "processing"
 
+    usages = [TokenUsage() for _ in uploaded_files]
+    partial_results = [[] for _ in uploaded_files]
+
+    def chunk_done(file_index, page_num, articles, done, total):
+        rows = [pdf_article_dict(article, uploaded_files[file_index].name) for article in articles]
+        if keywords:
+            rows = filter_pdf_articles(rows, keywords)
+        partial_results[file_index].extend(rows)
+        if on_articles is not None:
+            on_articles(file_index, rows, done, total)
+
+    pdf_paths = []
+    tmp_dir = tempfile.mkdtemp(prefix="pdf_upload_")
     try:
-        print(f"[INFO] Starting PDF processing for: {uploaded_file.name}")
+        print(f"[INFO] Starting PDF processing for {len(uploaded_files)} files")
 
-        # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            pdf_path = tmp_file.name
+        # Save uploaded files to a temporary directory under their original names,
+        # so source and edition date can still be read from the filename
+        for i, uploaded_file in enumerate(uploaded_files):
+            file_dir = os.path.join(tmp_dir, str(i))
+            os.makedirs(file_dir)
+            pdf_path = os.path.join(file_dir, os.path.basename(uploaded_file.name))
+            with open(pdf_path, 'wb') as tmp_file:
+                tmp_file.write(uploaded_file.getvalue())
+            pdf_paths.append(pdf_path)
 
-        print(f"[INFO] PDF saved to temporary file: {pdf_path}")
+        print(f"[INFO] PDFs saved to temporary files: {pdf_paths}")
 
-        # Initialize extractor with Azure OpenAI config
-        extractor = NewspaperExtractor(
-            azure_endpoint=azure_config["endpoint"],
-            azure_key=azure_config["api_key"],
-            api_version=azure_config["api_version"]
+        # Shared extractor with Azure OpenAI config
+        extractor = get_pdf_extractor()
+
+        print(f"[INFO] Starting PDF extraction...")
+        results = extractor.process_pdfs(
+            pdf_paths, usages=usages, on_chunk=chunk_done,
+            reuse_stored=not st.session_state.get("pdf_reextract", False)
         )
 
-        print(f"[INFO] Extractor initialized with Azure config")
+        file_results = []
+        for uploaded_file, articles, usage in zip(uploaded_files, results, usages):
+            print(f"[INFO] {uploaded_file.name}: PDF extraction completed. Found {len(articles)} articles, "
+                  f"{usage.total_tokens} tokens in {usage.requests} requests ({usage.cached_requests} cached)")
 
-        # Process PDF
-        print(f"[INFO] Starting PDF extraction...")
-        articles = extractor.process_pdf(pdf_path)
-        print(f"[INFO] PDF extraction completed. Found {len(articles)} articles")
-
-        # Clean up temp file
-        os.unlink(pdf_path)
-        print(f"[INFO] Temporary file cleaned up")
-
-        # Convert to dict format for easier handling
-        articles_dict = []
-        for article in articles:
-            article_dict = {
-                'judul': article.judul,
-                'konten': article.konten,
-                'kategori': article.kategori,
-                'halaman': article.halaman,
-                'sumber': article.sumber
-            }
-            articles_dict.append(article_dict)
-
-        print(f"[INFO] Converted {len(articles_dict)} articles to dict format")
-
-        # Apply keyword filtering if specified
-        factory = StemmerFactory()
-        stemmer = factory.create_stemmer()
+            # Convert to dict format for easier handling
+            articles_dict = [pdf_article_dict(article, uploaded_file.name) for article in articles]
 
-        if keywords:
-            print(f"[INFO] Applying keyword filtering: {keywords}")
-            filtered_articles = []
-            keyword_stems = [stemmer.stem(k.lower()) for k in keywords]
-            for article in articles_dict:
-                text_to_search = (article['judul'] + ' ' + article['konten']).lower()
-                cleaned_text = re.sub(r'\s+', ' ', text_to_search) # hapus spasi berlebih
-                cleaned_text = re.sub(r'[^\w\s]', ' ', cleaned_text) # hapus tanda baca
-                words = cleaned_text.split()
-                cleaned_text_stems = [stemmer.stem(w) for w in words]
-                if any(k in cleaned_text_stems for k in keyword_stems):
-                    filtered_articles.append(article)
-            articles_dict = filtered_articles
-            print(f"[INFO] After filtering: {len(articles_dict)} articles remain")
+            # Apply keyword filtering if specified
+            if keywords:
+                articles_dict = filter_pdf_articles(articles_dict, keywords)
+
+            file_results.append(articles_dict)
 
         st.session_state.pdf_extraction_status = "completed"
         print(f"[INFO] PDF processing completed successfully")
-        return articles_dict
+        return file_results, [usage.as_dict() for usage in usages]
 
     except Exception as e:
         print(f"[ERROR] PDF processing failed: {e}")
         st.session_state.pdf_extraction_status = "error"
         st.error(f"❌ PDF processing error: {e}")
-        return []
+        # Chunks that finished before the failure are kept (unmerged)
+        return partial_results, [usage.as_dict() for usage in usages]
+    finally:
+        # Clean up temp files
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
 def render_pdf_scraper_sidebar():
     """Render sidebar content for PDF Scraper mode"""
@@ -1350,6 +1203,14 @@ def render_pdf_scraper_sidebar():
             if pdf_keywords:
                 st.caption(f"🔍 Filtering by: {', '.join(pdf_keywords)}")
 
+        if PDF_STORE_ARTICLES:
+            st.checkbox(
+                "Re-extract stored editions",
+                value=False,
+                help="PDF files already extracted are loaded from the database; tick to send them to the LLM again and replace the stored articles",
+                key="pdf_reextract"
+            )
+
         return uploaded_pdfs, pdf_keywords
 
 # Tools moved to main content area for better organization
@@ -1402,10 +1263,23 @@ if st.session_state.scraper_mode == "PDF Scraper":
             progress_bar = st.progress(0)
             status_text = st.empty()
             file_status = st.empty()
+            live_table = st.empty()
 
             all_pdf_results = []
+            live_rows = []
             total_files = len(uploaded_pdfs)
 
+            def show_partial_articles(file_index, rows, done, total):
+                # Articles appear as soon as their chunk is done, not when the whole batch is
+                live_rows.extend(rows)
+                progress_bar.progress(0.05 + 0.9 * done / total)
+                status_text.text(f"🔄 {done}/{total} chunks done · {len(live_rows)} articles so far")
+                if rows:
+                    live_table.dataframe(
+                        pd.DataFrame(live_rows)[['source_file', 'halaman', 'judul', 'kategori']],
+                        width='stretch', height=300
+                    )
+
             print(f"[INFO] Starting PDF extraction for {total_files} files")
             print(f"[INFO] Azure OpenAI configured: {AZURE_OPENAI_AVAILABLE}")
             print(f"[INFO] LangChain available: {LANGCHAIN_AVAILABLE}")
@@ -1416,38 +1290,33 @@ if st.session_state.scraper_mode == "PDF Scraper":
                 st.session_state.pdf_filtered_df = None
                 st.session_state.pdf_extraction_status = "processing"
 
-                # Process each PDF file with progress tracking
-                for i, uploaded_pdf in enumerate(uploaded_pdfs):
-                    current_progress = (i / total_files)
-                    progress_bar.progress(current_progress)
-
-                    file_status.info(f"📄 Processing file {i+1}/{total_files}: **{uploaded_pdf.name}**")
-                    status_text.text(f"🔄 Extracting articles from {uploaded_pdf.name}...")
-
-                    # Process the PDF with error handling
-                    try:
-                        pdf_results = process_pdf_file(uploaded_pdf, pdf_keywords if pdf_keywords else None)
+                # All files in one batch: text extraction in a process pool,
+                # LLM requests from every file through one bounded concurrent queue
+                progress_bar.progress(0.05)
+                file_status.info(f"📄 Processing {total_files} file(s) in one batch")
+                status_text.text(f"🔄 Extracting articles from {total_files} file(s)...")
 
-                        if pdf_results and len(pdf_results) > 0:
-                            # Add source information to each article
-                            for article in pdf_results:
-                                article['source_file'] = uploaded_pdf.name
-                            all_pdf_results.extend(pdf_results)
+                file_results, file_usages = process_pdf_files(
+                    uploaded_pdfs, pdf_keywords if pdf_keywords else None, on_articles=show_partial_articles
+                )
+                extraction_failed = st.session_state.pdf_extraction_status == "error"
+                total_tokens = sum(usage.get('total_tokens', 0) for usage in file_usages)
+                live_table.empty()
 
-                            status_text.success(f"✅ {uploaded_pdf.name}: {len(pdf_results)} articles extracted")
-                            print(f"[SUCCESS] {uploaded_pdf.name}: {len(pdf_results)} articles extracted")
-                        else:
-                            status_text.warning(f"⚠️ {uploaded_pdf.name}: No articles found")
-                            print(f"[WARNING] {uploaded_pdf.name}: No articles found")
+                for i, (uploaded_pdf, pdf_results, usage) in enumerate(zip(uploaded_pdfs, file_results, file_usages)):
+                    progress_bar.progress((i + 1) / total_files)
 
-                    except Exception as file_error:
-                        status_text.error(f"❌ {uploaded_pdf.name}: Processing failed - {str(file_error)}")
-                        print(f"[ERROR] {uploaded_pdf.name}: Processing failed - {str(file_error)}")
-                        continue  # Continue with next file
+                    if pdf_results:
+                        all_pdf_results.extend(pdf_results)
 
-                    # Small delay for UI update
-                    import time
-                    time.sleep(0.5)
+                        status_text.success(
+                            f"✅ {uploaded_pdf.name}: {len(pdf_results)} articles extracted · "
+                            f"{usage.get('total_tokens', 0):,} tokens ({usage.get('cached_requests', 0)} chunks from cache)"
+                        )
+                        print(f"[SUCCESS] {uploaded_pdf.name}: {len(pdf_results)} articles extracted")
+                    else:
+                        status_text.warning(f"⚠️ {uploaded_pdf.name}: No articles found")
+                        print(f"[WARNING] {uploaded_pdf.name}: No articles found")
 
                 # Complete progress
                 progress_bar.progress(1.0)
@@ -1456,11 +1325,16 @@ if st.session_state.scraper_mode == "PDF Scraper":
                 # Update session state with results
                 if all_pdf_results:
                     st.session_state.pdf_articles = all_pdf_results
-                    st.session_state.pdf_filtered_df = pd.DataFrame(all_pdf_results)
+                    st.session_state.pdf_filtered_df = compact_frame(pd.DataFrame(all_pdf_results))
                     st.session_state.pdf_extraction_status = "completed"
 
-                    st.success(f"🎉 **Extraction Complete!** Extracted {len(all_pdf_results)} articles from {total_files} PDF file(s)")
-                    status_text.success("✅ All files processed successfully!")
+                    if extraction_failed:
+                        st.warning(f"⚠️ **Extraction stopped early.** Keeping {len(all_pdf_results)} articles "
+                                   f"from the chunks that finished (continued articles are not merged)")
+                        status_text.warning("⚠️ Partial results only")
+                    else:
+                        st.success(f"🎉 **Extraction Complete!** Extracted {len(all_pdf_results)} articles from {total_files} PDF file(s)")
+                        status_text.success("✅ All files processed successfully!")
 
                     # Show summary
                     st.info(f"""
@@ -1468,6 +1342,7 @@ if st.session_state.scraper_mode == "PDF Scraper":
                     - Files processed: {total_files}
                     - Total articles: {len(all_pdf_results)}
                     - Average per file: {len(all_pdf_results)/total_files:.1f} articles
+                    - LLM tokens: {total_tokens:,} (avg {total_tokens/total_files:,.0f} per file)
                     """)
 
                     print(f"[SUCCESS] Total extraction complete: {len(all_pdf_results)} articles from {total_files} files")
@@ -1535,76 +1410,182 @@ if st.session_state.scraper_mode == "PDF Scraper":
 
             # Store results
             st.session_state.pdf_articles = all_pdf_results
-            st.session_state.pdf_filtered_df = pd.DataFrame(all_pdf_results) if all_pdf_results else pd.DataFrame()
+            st.session_state.pdf_filtered_df = compact_frame(pd.DataFrame(all_pdf_results)) if all_pdf_results else pd.DataFrame()
 
 # Source selection removed - all sources are now included by default
 
 
-def query_articles_from_db(start_date, end_date, keywords):
-    """Query articles from database with filters."""
+@st.cache_resource
+def get_result_cache():
+    """Search results shared by all sessions, invalidated by the scraper's rollup watermark."""
+    return db_utils.ResultCache()
+
+
+def query_articles_from_db(start_date, end_date, keywords, after=None, limit=db_utils.SEARCH_PAGE_SIZE):
+    """
+    Query one page of articles from database with filters.
+
+    Only list columns are fetched (no contents); ``after`` is the (date, id)
+    of the last row of the previous page. Returns (results_df, has_more).
+    """
     conn = get_mysql_conn()
     if not conn:
         st.error("❌ Cannot query database - no connection available")
-        return []
+        return pd.DataFrame(), False
 
     try:
-        cursor = conn.cursor()
-
-        # Build query with filters
-        query = """
-            SELECT id, date, title, contents, reporter, sources, links
-            FROM news_articles
-            WHERE 1=1
-        """
-        params = []
-
-        # Date filter
-        if start_date:
-            query += " AND date >= %s"
-            params.append(start_date.strftime('%Y-%m-%d'))
+        # Keyset pagination on (date, id); BPS category is classified by MySQL
+        fetch_page = lambda: db_utils.search_articles_page(conn, start_date, end_date, keywords, after=after, limit=limit)
+        if limit >= db_utils.STREAM_THRESHOLD:
+            # Large pages are streamed (SSDictCursor) and not kept in the shared cache
+            columns, has_more = fetch_page()
+        else:
+            columns, has_more = get_result_cache().get_or_compute(
+                db_utils.search_cache_key("page", start_date, end_date, keywords, after, limit),
+                db_utils.range_watermark(conn, start_date, end_date),
+                fetch_page
+            )
+        # Built from column arrays; the (possibly cached) lists are copied, never modified
+        results_df = pd.DataFrame(columns, columns=db_utils.SEARCH_COLUMNS)
+        results_df['bps_category_name'] = results_df['bps_category'].map(lambda code: BPS_CATEGORIES.get(code, code))
+        return compact_frame(results_df), has_more
 
-        if end_date:
-            query += " AND date <= %s"
-            params.append(end_date.strftime('%Y-%m-%d'))
+    except Exception as e:
+        st.error(f"Database query error: {e}")
+        return pd.DataFrame(), False
+    finally:
+        conn.close()
 
-        # Source filter removed - all sources included by default
 
-        # Keyword filter (search in title and contents)
-        if keywords:
-            keyword_conditions = []
-            for keyword in keywords:
-                keyword_conditions.append("(title LIKE %s OR contents LIKE %s)")
-                params.extend([f'%{keyword}%', f'%{keyword}%'])
+def duckdb_analytics_enabled():
+    """DuckDB path is used only when configured, installed and the archive has been exported."""
+    return (
+        ANALYTICS_BACKEND == "duckdb"
+        and parquet_archive.DUCKDB_AVAILABLE
+        and os.path.exists(os.path.join(PARQUET_ARCHIVE_DIR, parquet_archive.STATE_NAME))
+    )
 
-            if keyword_conditions:
-                query += " AND (" + " OR ".join(keyword_conditions) + ")"
 
-        query += " ORDER BY date DESC, id DESC"
+def query_analytics(kind, start_date, end_date, keywords, mysql_query, duckdb_query):
+    """
+    Run an aggregate query for the search filters through the shared result cache,
+    over the Parquet archive with DuckDB when enabled, otherwise on MySQL.
+    """
+    if duckdb_analytics_enabled():
+        try:
+            return get_result_cache().get_or_compute(
+                db_utils.search_cache_key(kind + "-duckdb", start_date, end_date, keywords),
+                parquet_archive.archive_watermark(PARQUET_ARCHIVE_DIR),
+                lambda: duckdb_query(PARQUET_ARCHIVE_DIR, start_date, end_date, keywords)
+            )
+        except Exception as e:
+            st.warning(f"⚠️ DuckDB analytics failed, falling back to MySQL: {e}")
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+    conn = get_mysql_conn()
+    if not conn:
+        return None
+    try:
+        return get_result_cache().get_or_compute(
+            db_utils.search_cache_key(kind, start_date, end_date, keywords),
+            db_utils.range_watermark(conn, start_date, end_date),
+            lambda: mysql_query(conn, start_date, end_date, keywords)
+        )
+    finally:
+        conn.close()
 
-        # DictCursor already returns dictionaries, no need to convert
-        results = list(rows) if rows else []
 
-        # Add BPS category classification for each article
-        for article in results:
-            # Use unified BPS classification function
-            content_text = (article.get('title', '') + ' ' + article.get('contents', '')).lower()
-            bps_category = classify_bps_category(content_text)
+def get_search_summary(start_date, end_date, keywords):
+    """Total count, date range and source count over all pages of a search."""
+    try:
+        return query_analytics("summary", start_date, end_date, keywords,
+                               db_utils.search_summary, parquet_archive.duckdb_search_summary)
+    except Exception as e:
+        st.error(f"Database query error: {e}")
+        return None
 
-            # Add BPS category to article
-            article['bps_category'] = bps_category
-            article['bps_category_name'] = BPS_CATEGORIES.get(bps_category, bps_category)
 
-        cursor.close()
+@st.cache_data(ttl=600, max_entries=500, show_spinner=False)
+def get_article_contents(article_id):
+    """Load the full text of one article (only when it is opened, cached across reruns)."""
+    conn = get_mysql_conn()
+    if not conn:
+        # Raised rather than returned so a failed lookup is not cached
+        raise ConnectionError("No database connection available")
+    try:
+        return db_utils.get_article_contents(conn, article_id)
+    finally:
         conn.close()
 
-        return results
 
+def get_chart_data(start_date, end_date, keywords):
+    """Aggregated counts by source, BPS category and day for the whole search (GROUP BY in the database)."""
+    empty = {
+        'sources': pd.DataFrame(columns=['Source', 'Count']),
+        'bps': pd.DataFrame(columns=['BPS_Category', 'Count']),
+        'days': pd.DataFrame(columns=['Date', 'Count']),
+    }
+    try:
+        data = query_analytics("charts", start_date, end_date, keywords,
+                               db_utils.search_aggregates, parquet_archive.duckdb_search_aggregates)
     except Exception as e:
         st.error(f"Database query error: {e}")
-        return []
+        return empty
+    if data is None:
+        return empty
+    days = pd.DataFrame(data['days'], columns=['Date', 'Count'])
+    days['Date'] = pd.to_datetime(days['Date'])
+    return {
+        'sources': pd.DataFrame(data['sources'], columns=['Source', 'Count']),
+        'bps': pd.DataFrame(data['bps'], columns=['BPS_Category', 'Count']),
+        'days': days,
+    }
+
+
+def load_results_page(after):
+    """Re-run the last search for the page starting after ``after``."""
+    query = st.session_state.last_query
+    results_df, has_more = query_articles_from_db(
+        query['start_date'], query['end_date'], query['keywords'], after=after, limit=query['page_size']
+    )
+    # Only ids here; the page itself lives in filtered_df
+    st.session_state.query_results = results_df['id'].tolist() if not results_df.empty else []
+    st.session_state.filtered_df = results_df
+    st.session_state.web_has_more = has_more
+
+
+def remember_export(state_key, path, fmt, owner, prefix):
+    """Keep the path of a prepared export file (deleting the previous one)."""
+    discard_export(state_key)
+    st.session_state[state_key] = {
+        'path': path,
+        'format': fmt,
+        'owner': owner,
+        'file_name': f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{export_utils.FORMATS[fmt][0]}"
+    }
+
+
+def discard_export(state_key):
+    export = st.session_state.get(state_key)
+    if export and os.path.exists(export['path']):
+        os.remove(export['path'])
+    st.session_state[state_key] = None
+
+
+def show_export_download(state_key, owner):
+    """Download button for a prepared export, if it still belongs to the shown results."""
+    export = st.session_state.get(state_key)
+    if not export or export['owner'] != owner or not os.path.exists(export['path']):
+        st.info("Choose a format and click **Prepare Export** to build the file.")
+        return
+    size_mb = os.path.getsize(export['path']) / (1024 * 1024)
+    with open(export['path'], 'rb') as f:
+        st.download_button(
+            label=f"📥 Download {export['format']} ({size_mb:.1f} MB)",
+            data=f,
+            file_name=export['file_name'],
+            mime=export_utils.FORMATS[export['format']][1],
+            use_container_width=True
+        )
 
 
 # Main interface - only show in Web Scraper mode
@@ -1618,6 +1599,8 @@ if st.session_state.scraper_mode == "Web Scraper":
         if keywords:
             st.info(f"🔍 Keywords: {', '.join(keywords)}")
 
+        page_size = st.selectbox("Rows per page", db_utils.SEARCH_PAGE_SIZES, key="web_page_size")
+
         if st.button("🔍 Search Articles", type="primary", use_container_width=True):
             # Enhanced search with progress tracking
             progress_bar = st.progress(0)
@@ -1630,36 +1613,43 @@ if st.session_state.scraper_mode == "Web Scraper":
                 status_text.text("🔍 Executing search query...")
                 progress_bar.progress(0.5)
 
-                # Query database with current filters
-                results = query_articles_from_db(start_date, end_date, keywords)
+                # Query first page of results with current filters
+                results_df, has_more = query_articles_from_db(start_date, end_date, keywords, limit=page_size)
+                summary = get_search_summary(start_date, end_date, keywords)
+                total_found = summary['total'] if summary else len(results_df)
                 progress_bar.progress(0.8)
 
                 status_text.text("📊 Processing results...")
                 progress_bar.progress(0.9)
 
                 # Store results
-                st.session_state.query_results = results
-                st.session_state.filtered_df = pd.DataFrame(results) if results else pd.DataFrame()
+                st.session_state.query_results = results_df['id'].tolist() if not results_df.empty else []
+                st.session_state.filtered_df = results_df
                 st.session_state.last_query = {
                     'start_date': start_date,
                     'end_date': end_date,
-                    'keywords': keywords
+                    'keywords': keywords,
+                    'page_size': page_size
                 }
+                st.session_state.web_page_cursors = [None]
+                st.session_state.web_has_more = has_more
+                st.session_state.web_summary = summary
+                discard_export('web_export')
 
                 # Complete progress
                 progress_bar.progress(1.0)
                 progress_bar.empty()
                 status_text.empty()
 
-                if results:
-                    st.success(f"🎉 **Search Complete!** Found {len(results)} articles matching your criteria")
+                if not results_df.empty:
+                    st.success(f"🎉 **Search Complete!** Found {total_found:,} articles matching your criteria")
 
                     # Show quick summary
                     st.info(f"""
                     📊 **Search Summary:**
                     - Date range: {start_date} to {end_date}
                     - Keywords: {', '.join(keywords) if keywords else 'None'}
-                    - Results: {len(results)} articles found
+                    - Results: {total_found:,} articles found ({page_size:,} per page)
                     """)
                 else:
                     st.warning("⚠️ No articles found matching your search criteria. Try adjusting the filters.")
@@ -1696,6 +1686,11 @@ if st.session_state.scraper_mode == "Web Scraper":
 if st.session_state.scraper_mode == "Web Scraper":
     if st.session_state.filtered_df is not None and not st.session_state.filtered_df.empty:
         df = st.session_state.filtered_df
+        # df holds the current page only; totals come from the search summary
+        summary = st.session_state.web_summary or {}
+        total_articles = summary.get('total', len(df))
+        last_query = st.session_state.last_query
+        chart_data = get_chart_data(last_query['start_date'], last_query['end_date'], last_query['keywords'])
 
         # Enhanced Results Summary with Cards
         st.subheader("📊 Analysis Results")
@@ -1706,15 +1701,15 @@ if st.session_state.scraper_mode == "Web Scraper":
         with col1:
             st.metric(
                 label="📄 Total Articles",
-                value=f"{len(df):,}",
+                value=f"{total_articles:,}",
                 help="Number of articles found matching your search criteria"
             )
 
         with col2:
             # Calculate date range properly
-            if len(df) > 0 and 'date' in df.columns:
-                min_date = pd.to_datetime(df['date']).min().strftime('%Y-%m-%d')
-                max_date = pd.to_datetime(df['date']).max().strftime('%Y-%m-%d')
+            if summary.get('min_date') and summary.get('max_date'):
+                min_date = summary['min_date'].strftime('%Y-%m-%d')
+                max_date = summary['max_date'].strftime('%Y-%m-%d')
                 date_range = f"{min_date} to {max_date}"
             else:
                 date_range = "No data"
@@ -1726,10 +1721,7 @@ if st.session_state.scraper_mode == "Web Scraper":
 
         with col3:
             # Count unique sources
-            if 'sources' in df.columns:
-                unique_sources = df['sources'].dropna().replace('', pd.NA).dropna().nunique()
-            else:
-                unique_sources = 0
+            unique_sources = summary.get('source_count', 0)
             st.metric(
                 label="📰 News Sources",
                 value=unique_sources,
@@ -1745,24 +1737,48 @@ if st.session_state.scraper_mode == "Web Scraper":
 
             with insight_col1:
                 # BPS Category Distribution
-                if 'bps_category' in df.columns:
-                    bps_counts = df['bps_category'].value_counts()
-                    if not bps_counts.empty:
-                        dominant_bps = bps_counts.index[0]
-                        dominant_name = BPS_CATEGORIES.get(dominant_bps, dominant_bps)
-                        st.info(f"🏷️ **Top BPS:** {dominant_bps} ({dominant_name})")
+                bps_counts = chart_data['bps']
+                if not bps_counts.empty:
+                    dominant_bps = bps_counts['BPS_Category'].iloc[0]
+                    dominant_name = BPS_CATEGORIES.get(dominant_bps, dominant_bps)
+                    st.info(f"🏷️ **Top BPS:** {dominant_bps} ({dominant_name})")
 
         # Data preview
         st.subheader("👀 Article Results")
-        st.dataframe(df, width='stretch', height=400)
+        page_number = len(st.session_state.web_page_cursors)
+        first_row = (page_number - 1) * last_query['page_size'] + 1
+        st.caption(f"Page {page_number} · articles {first_row:,}–{first_row + len(df) - 1:,} of {total_articles:,}")
+        # Light index view only; reporter, link and contents are shown for the selected article
+        st.dataframe(
+            df[RESULT_TABLE_COLUMNS], width='stretch', height=400,
+            column_config={"date": st.column_config.DateColumn("date", format="YYYY-MM-DD")}
+        )
+
+        prev_col, _, next_col = st.columns([1, 3, 1])
+        with prev_col:
+            if st.button("◀ Previous", disabled=page_number == 1, use_container_width=True):
+                st.session_state.web_page_cursors.pop()
+                load_results_page(st.session_state.web_page_cursors[-1])
+                st.rerun()
+        with next_col:
+            if st.button("Next ▶", disabled=not st.session_state.web_has_more, use_container_width=True):
+                last_row = df.iloc[-1]
+                cursor = (last_row['date'].date(), int(last_row['id']))
+                st.session_state.web_page_cursors.append(cursor)
+                load_results_page(cursor)
+                st.rerun()
 
         # Article details view
         st.subheader("📄 Article Details")
         if not df.empty:
+            # Labels built once per rerun with vectorized string ops instead of a row lookup per option
+            article_labels = (
+                df['date'].dt.strftime('%Y-%m-%d') + ' - ' + df['title'].str.slice(0, 50) + '...'
+            ).tolist()
             selected_article = st.selectbox(
                 "Select an article to view details:",
-                options=df.index,
-                format_func=lambda x: f"{df.iloc[x]['date']} - {df.iloc[x]['title'][:50]}..."
+                options=range(len(article_labels)),
+                format_func=article_labels.__getitem__
             )
 
             if selected_article is not None:
@@ -1770,7 +1786,7 @@ if st.session_state.scraper_mode == "Web Scraper":
                 st.markdown(f"### {article['title']}")
                 col1, col2 = st.columns(2)
                 with col1:
-                    st.write(f"**Date:** {article['date']}")
+                    st.write(f"**Date:** {article['date']:%Y-%m-%d}")
                     st.write(f"**Source:** {article['sources']}")
                     st.write(f"**🏷️ BPS Category:** {article.get('bps_category', 'UMUM')} - {article.get('bps_category_name', 'UMUM')}")
                 with col2:
@@ -1778,10 +1794,15 @@ if st.session_state.scraper_mode == "Web Scraper":
                     if article.get('links'):
                         st.write(f"**Link:** [{article['links']}]({article['links']})")
 
-                if article.get('contents'):
+                # Contents are not part of the results page, load them for this article only
+                try:
+                    content = get_article_contents(int(article['id']))
+                except ConnectionError:
+                    st.warning("⚠️ Article content is unavailable - no database connection")
+                    content = None
+                if content:
                     st.markdown("**Content:**")
                     # Truncate content if too long
-                    content = article['contents']
                     if len(content) > 1000:
                         content = content[:1000] + "..."
                     st.write(content)
@@ -1790,11 +1811,10 @@ if st.session_state.scraper_mode == "Web Scraper":
         if len(df) > 0:
             st.subheader("📊 Data Visualization")
 
-            # Articles by source
-            if 'sources' in df.columns:
+            # Articles by source (all matching articles, counted by MySQL)
+            source_counts = chart_data['sources']
+            if not source_counts.empty:
                 st.markdown("**Articles by Source:**")
-                source_counts = df['sources'].value_counts().reset_index()
-                source_counts.columns = ['Source', 'Count']
 
                 chart = alt.Chart(source_counts).mark_bar().encode(
                     x=alt.X('Source:N', axis=alt.Axis(labelAngle=0)),  # Horizontal labels
@@ -1805,10 +1825,9 @@ if st.session_state.scraper_mode == "Web Scraper":
                 st.altair_chart(chart, use_container_width=True)
 
             # Articles by BPS Category
-            if 'bps_category' in df.columns:
+            bps_counts = chart_data['bps'].copy()
+            if not bps_counts.empty:
                 st.markdown("**🏷️ Articles by BPS Category:**")
-                bps_counts = df['bps_category'].value_counts().reset_index()
-                bps_counts.columns = ['BPS_Category', 'Count']
 
                 # Add category names for better readability
                 bps_counts['Category_Name'] = bps_counts['BPS_Category'].map(lambda x: BPS_CATEGORIES.get(x, x))
@@ -1823,13 +1842,9 @@ if st.session_state.scraper_mode == "Web Scraper":
                 st.altair_chart(chart, use_container_width=True)
 
             # Articles by date (timeline)
-            if 'date' in df.columns:
+            daily_counts = chart_data['days']
+            if not daily_counts.empty:
                 st.markdown("**Articles Timeline:**")
-                # Convert date column to datetime and count by date
-                df_copy = df.copy()
-                df_copy['date'] = pd.to_datetime(df_copy['date'])
-                daily_counts = df_copy.groupby(df_copy['date'].dt.date).size().reset_index()
-                daily_counts.columns = ['Date', 'Count']
 
                 chart = alt.Chart(daily_counts).mark_line(point=True).encode(
                     x=alt.X('Date:T', axis=alt.Axis(labelAngle=0)),  # Horizontal labels
@@ -1842,26 +1857,28 @@ if st.session_state.scraper_mode == "Web Scraper":
         # Web Scraper Download - consistent with PDF Scraper
         if not df.empty:
             st.subheader("📥 Download Results")
+            st.caption(f"Exports contain all {total_articles:,} matching articles with full contents. "
+                       "The file is only built when you click Prepare Export.")
             col1, col2 = st.columns(2)
             with col1:
-                csv_data = df.to_csv(index=False, encoding='utf-8-sig')
-                st.download_button(
-                    label="📥 Download CSV",
-                    data=csv_data,
-                    file_name=f"web_articles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+                web_export_format = st.selectbox("Format", export_utils.available_formats(), key="web_export_format")
+                if st.button("⚙️ Prepare Export", key="web_export_prepare", use_container_width=True):
+                    conn = get_mysql_conn()
+                    if conn:
+                        try:
+                            with st.spinner("Writing export file..."):
+                                # Rows are streamed from MySQL in chunks straight into the file
+                                path = export_utils.export_search(
+                                    conn, last_query['start_date'], last_query['end_date'],
+                                    last_query['keywords'], web_export_format
+                                )
+                            remember_export('web_export', path, web_export_format, id(last_query), "web_articles")
+                        except Exception as e:
+                            st.error(f"Export failed: {e}")
+                        finally:
+                            conn.close()
             with col2:
-                # JSON download
-                json_data = df.to_json(orient='records', indent=2, force_ascii=False)
-                st.download_button(
-                    label="📥 Download JSON",
-                    data=json_data,
-                    file_name=f"web_articles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json",
-                    use_container_width=True
-                )
+                show_export_download('web_export', id(last_query))
 
     elif st.session_state.last_query is not None:
         st.info("No articles found matching your current filters. Try adjusting the date range or keywords.")
@@ -1919,13 +1936,13 @@ if st.session_state.scraper_mode == "PDF Scraper" and st.session_state.pdf_filte
 
             with insight_col2:
                 if 'source_file' in df_pdf.columns:
-                    file_sizes = df_pdf.groupby('source_file').size()
+                    file_sizes = df_pdf.groupby('source_file', observed=True).size()
                     avg_articles_per_file = file_sizes.mean()
                     st.info(f"📊 **Avg per File:** {avg_articles_per_file:.1f} articles")
 
         # PDF Articles Table
         st.subheader("📋 Extracted Articles")
-        st.dataframe(df_pdf, width='stretch', height=400)
+        st.dataframe(preview_frame(df_pdf), width='stretch', height=400)
 
         # File summary view for PDF
         st.subheader("📄 PDF File Summary")
@@ -1958,11 +1975,7 @@ if st.session_state.scraper_mode == "PDF Scraper" and st.session_state.pdf_filte
                     # Use AI to generate description if available
                     if LANGCHAIN_AVAILABLE and AZURE_OPENAI_AVAILABLE:
                         try:
-                            extractor = NewspaperExtractor(
-                                azure_endpoint=azure_config["endpoint"],
-                                azure_key=azure_config["api_key"],
-                                api_version=azure_config["api_version"]
-                            )
+                            extractor = get_pdf_extractor()
                             ai_description = extractor.generate_file_description_ai(articles, file_name)
                             return ai_description.description
                         except Exception as e:
@@ -2188,24 +2201,16 @@ if st.session_state.scraper_mode == "PDF Scraper" and st.session_state.pdf_filte
             st.subheader("📥 Download Results")
             col1, col2 = st.columns(2)
             with col1:
-                csv_pdf_data = df_pdf.to_csv(index=False, encoding='utf-8-sig')
-                st.download_button(
-                    label="📥 Download CSV",
-                    data=csv_pdf_data,
-                    file_name=f"pdf_articles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+                pdf_export_format = st.selectbox("Format", export_utils.available_formats(), key="pdf_export_format")
+                if st.button("⚙️ Prepare Export", key="pdf_export_prepare", use_container_width=True):
+                    try:
+                        with st.spinner("Writing export file..."):
+                            path = export_utils.export_dataframe(df_pdf, pdf_export_format, "pdf_articles_")
+                        remember_export('pdf_export', path, pdf_export_format, (id(df_pdf), len(df_pdf)), "pdf_articles")
+                    except Exception as e:
+                        st.error(f"Export failed: {e}")
             with col2:
-                # JSON download
-                json_pdf_data = df_pdf.to_json(orient='records', indent=2, force_ascii=False)
-                st.download_button(
-                    label="📥 Download JSON",
-                    data=json_pdf_data,
-                    file_name=f"pdf_articles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json",
-                    use_container_width=True
-                )
+                show_export_download('pdf_export', (id(df_pdf), len(df_pdf)))
 
 # PDF Processing Status
 elif st.session_state.pdf_extraction_status == "processing" and st.session_state.scraper_mode == "PDF Scraper":
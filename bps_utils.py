@@ -0,0 +1,181 @@
+"""
+Keyword rules for the BPS (KBLI) category classifier.
+
+The rules are data so the same classification can run in Python
+(classify_text) and inside MySQL (case_sql), e.g. to label a page of search
+results without sending article contents to the dashboard. Order matters:
+the first rule with a matching keyword wins, anything else is 'UMUM'.
+"""
+import hashlib
+
+BPS_KEYWORD_RULES = [
+    # A1: Pertanian, Tanaman Pangan, Hortikultura, Perkebunan, Peternakan, Perburuan, Jasa Pertanian
+    ("A1", [
+        'pertanian', 'tanaman', 'padi', 'jagung', 'beras', 'palawija', 'hortikultura',
+        'perkebunan', 'sawit', 'kelapa', 'kakao', 'kopi', 'teh', 'cengkeh', 'petani',
+        'panen', 'pupuk', 'bibit', 'kehutanan', 'kayu', 'hutan', 'kehutanan',
+        'peternakan', 'ternak', 'sapi', 'ayam', 'kambing', 'perburuan', 'buruan'
+    ]),
+    # A2: Kehutanan dan Penebangan Kayu
+    ("A2", [
+        'kehutanan', 'penebangan', 'kayu', 'hutan', 'rimba', 'hutan lindung',
+        'pengelolaan hutan', 'kayu lapis', 'kayu gergajian'
+    ]),
+    # A3: Perikanan
+    ("A3", [
+        'perikanan', 'ikan', 'nelayan', 'laut', 'tambak', 'kolam', 'budidaya ikan',
+        'perikanan tangkap', 'udang', 'kepiting', 'cumi', 'gurita'
+    ]),
+    # B: Pertambangan dan Penggalian
+    ("B", [
+        'tambang', 'mining', 'galian', 'minerba', 'emas', 'tembaga', 'nikel',
+        'batubara', 'minyak', 'gas', 'panas bumi', 'pertambangan', 'miner'
+    ]),
+    # C1: Industri Makanan dan Minuman
+    ("C1", [
+        'makanan', 'minuman', 'kuliner', 'mamin', 'industri makanan', 'pengolahan makanan',
+        'roti', 'kue', 'susu', 'keju', 'yogurt', 'minuman ringan', 'jus', 'teh botol'
+    ]),
+    # C2: Industri Pengolahan
+    ("C2", [
+        'industri', 'pengolahan', 'manufaktur', 'pabrik', 'produksi', 'industri kimia',
+        'industri logam', 'industri plastik', 'industri karet', 'industri semen'
+    ]),
+    # C3: Industri Tekstil dan Pakaian Jadi
+    ("C3", [
+        'tekstil', 'pakaian', 'konveksi', 'garmen', 'baju', 'kaos', 'celana',
+        'kain', 'benang', 'spinning', 'weaving', 'garment'
+    ]),
+    # C4: Industri Elektronika
+    ("C4", [
+        'elektronik', 'teknologi', 'gadget', 'komputer', 'handphone', 'hp', 'smartphone',
+        'laptop', 'elektronika', 'semikonduktor', 'chip', 'elektronik konsumen'
+    ]),
+    # C5: Industri Kertas/barang dari Kertas
+    ("C5", [
+        'kertas', 'printing', 'media', 'publikasi', 'koran', 'majalah', 'buku',
+        'karton', 'tisu', 'printing press', 'percetakan'
+    ]),
+    # D: Pengadaan Listrik, Gas
+    ("D", [
+        'listrik', 'gas', 'energi', 'pln', 'kelistrikan', 'pembangkit', 'transmisi',
+        'distribusi', 'tenaga listrik', 'gas alam', 'lng'
+    ]),
+    # E: Pengadaan Air
+    ("E", [
+        'air', 'sanitasi', 'pdam', 'bersih', 'pengolahan air', 'air minum',
+        'sanitasi lingkungan', 'drainase', 'pengelolaan air'
+    ]),
+    # F: Konstruksi
+    ("F", [
+        'konstruksi', 'bangunan', 'jalan', 'infrastruktur', 'jembatan', 'gedung',
+        'proyek konstruksi', 'developer', 'kontraktor', 'sipil'
+    ]),
+    # G1: Perdagangan, Reparasi dan Perawatan Mobil dan Sepeda Motor
+    ("G1", [
+        'otomotif', 'mobil', 'motor', 'sepeda motor', 'dealer', 'showroom',
+        'bengkel', 'reparasi', 'service', 'sparepart', 'aksesoris kendaraan'
+    ]),
+    # G2: Perdagangan Eceran Berbagai Macam Barang di Toko, Supermarket/Minimarket
+    ("G2", [
+        'toko', 'supermarket', 'minimarket', 'retail', 'eceran', 'department store',
+        'mall', 'pusat perbelanjaan', 'ritel modern'
+    ]),
+    # G3: Perdagangan Eceran Kaki Lima dan Los Pasar
+    ("G3", [
+        'los pasar', 'kaki lima', 'pedagang', 'pasar tradisional', 'warung',
+        'pedagang keliling', 'pasar rakyat', 'retail tradisional'
+    ]),
+    # H1: Angkutan Darat
+    ("H1", [
+        'darat', 'bus', 'angkot', 'transportasi', 'angkutan', 'logistik', 'trucking',
+        'ekspedisi', 'kurir', 'delivery', 'ojek', 'taxi', 'angkot'
+    ]),
+    # H2: Angkutan Laut
+    ("H2", [
+        'laut', 'kapal', 'pelabuhan', 'maritim', 'shipping', 'kontainer',
+        'barang laut', 'perkapalan', 'pelayaran', 'marina'
+    ]),
+    # H3: Angkutan Udara
+    ("H3", [
+        'udara', 'pesawat', 'bandara', 'aviasi', 'penerbangan', 'airport',
+        'maskapai', 'airline', 'cargo udara', 'angkutan udara'
+    ]),
+    # I1: Akomodasi Hotel dan Pondok Wisata
+    ("I1", [
+        'hotel', 'wisata', 'akomodasi', 'hospitality', 'penginapan', 'villa',
+        'resort', 'homestay', 'pondok wisata', 'pariwisata'
+    ]),
+    # I2: Penyediaan Makanan dan Minuman (Kedai, Restoran, dsb)
+    ("I2", [
+        'restoran', 'kedai', 'makan', 'fnb', 'food and beverage', 'kafe',
+        'warung makan', 'rumah makan', 'food court', 'kuliner'
+    ]),
+    # J: Informasi dan Komunikasi
+    ("J", [
+        'komunikasi', 'internet', 'telekomunikasi', 'telekom', 'telepon',
+        'seluler', 'provider', 'operator', 'broadband', 'fiber optik'
+    ]),
+    # K: Jasa Keuangan
+    ("K", [
+        'keuangan', 'bank', 'asuransi', 'finance', 'perbankan', 'leasing',
+        'kredit', 'pinjaman', 'tabungan', 'investasi', 'sekuritas'
+    ]),
+    # L: Real Estate
+    ("L", [
+        'real estate', 'properti', 'perumahan', 'developer', 'real estat',
+        'property', 'apartemen', 'perumahan', 'landed house'
+    ]),
+    # MN: Jasa Perusahaan
+    ("MN", [
+        'perusahaan', 'bisnis', 'jasa', 'korporasi', 'konsultan', 'akuntan',
+        'legal', 'hukum', 'notaris', 'management consultant'
+    ]),
+    # O: Administrasi Pemerintahan, Pertahanan dan Jaminan Sosial Wajib
+    ("O", [
+        'pemerintah', 'pemda', 'bupati', 'dinas', 'kementerian', 'pemerintah daerah',
+        'administrasi', 'birokrasi', 'pelayanan publik', 'pemerintahan'
+    ]),
+    # P: Jasa Pendidikan
+    ("P", [
+        'pendidikan', 'sekolah', 'siswa', 'guru', 'universitas', 'kampus',
+        'pendidikan tinggi', 'sd', 'smp', 'sma', 'smk', 'kursus', 'pelatihan'
+    ]),
+    # Q: Jasa Kesehatan dan Kegiatan Sosial
+    ("Q", [
+        'kesehatan', 'rumah sakit', 'dokter', 'medis', 'klinik', 'puskesmas',
+        'bidan', 'perawat', 'farmasi', 'apotek', 'rs', 'hospital'
+    ]),
+    # RSTU: Jasa lainnya
+    ("RSTU", [
+        'jasa', 'servis', 'bisnis', 'usaha', 'konsultasi', 'perdagangan',
+        'entertainment', 'hiburan', 'olahraga', 'seni', 'budaya'
+    ]),
+]
+
+# Changes whenever a rule is edited; part of the dashboard result cache key
+RULES_VERSION = hashlib.sha1(repr(BPS_KEYWORD_RULES).encode("utf-8")).hexdigest()[:12]
+
+
+def classify_text(analysis_text):
+    """Return the BPS code for already lower-cased text."""
+    for code, words in BPS_KEYWORD_RULES:
+        if any(word in analysis_text for word in words):
+            return code
+    return 'UMUM'
+
+
+def case_sql(text_expr):
+    """
+    SQL CASE expression equivalent to classify_text(text_expr).
+
+    ``text_expr`` must already be lower-cased (e.g. a LOWER(...) column of a
+    derived table). Returns (sql, params) with one LIKE parameter per keyword.
+    """
+    whens, params = [], []
+    for code, words in BPS_KEYWORD_RULES:
+        whens.append(
+            "WHEN " + " OR ".join(f"{text_expr} LIKE %s" for _ in words) + f" THEN '{code}'"
+        )
+        params.extend(f"%{word}%" for word in words)
+    return "CASE " + " ".join(whens) + " ELSE 'UMUM' END", params
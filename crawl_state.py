@@ -0,0 +1,90 @@
+"""
+Crawl checkpoints so long backfills can be resumed after a crash.
+
+After every list page a scraper calls page_done(category_url, page, last_link)
+and scraper.py marks whole categories with category_done(). The state is a
+small JSON file rewritten atomically, e.g.:
+
+    {"https://gosulut.id/category/daerah/": {"page": 12, "last_link": "...",
+     "done": false, "updated_at": "2025-01-31T10:15:00"}}
+
+Without resume the file is reset at the start of a cycle; with
+``scraper.py --resume`` finished categories are skipped and unfinished ones
+continue after the last completed page. finish() removes the file once a
+cycle has gone through every category.
+"""
+import os
+import json
+from datetime import datetime
+
+STATE_FILE = None
+RESUME = False
+
+_state = {}
+
+
+def configure(state_file, resume=False):
+    """Load (resume=True) or reset the checkpoint file for this cycle."""
+    global STATE_FILE, RESUME, _state
+    STATE_FILE = state_file
+    RESUME = bool(resume)
+    _state = {}
+    if RESUME and os.path.exists(state_file):
+        try:
+            with open(state_file, "r", encoding="utf-8") as f:
+                _state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Cannot read checkpoint {state_file}, starting from scratch: {e}")
+            _state = {}
+        print(f"⏯️ Resuming crawl: {sum(1 for s in _state.values() if s.get('done'))} categories done, "
+              f"{sum(1 for s in _state.values() if not s.get('done'))} in progress")
+    elif os.path.exists(state_file):
+        os.remove(state_file)
+
+
+def _save():
+    if not STATE_FILE:
+        return
+    tmp_path = f"{STATE_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(_state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def start_page(category_url):
+    """First list page to fetch for category_url (1 unless resuming)."""
+    entry = _state.get(category_url)
+    if not entry or entry.get("done"):
+        return 1
+    print(f"⏯️ Resuming {category_url} after page {entry['page']} (last link: {entry.get('last_link')})")
+    return entry["page"] + 1
+
+
+def page_done(category_url, page, last_link=None):
+    """Record that every article on list page ``page`` has been handled."""
+    _state[category_url] = {
+        "page": page,
+        "last_link": last_link,
+        "done": False,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    _save()
+
+
+def category_done(category_url):
+    entry = _state.setdefault(category_url, {"page": 0, "last_link": None})
+    entry["done"] = True
+    entry["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    _save()
+
+
+def is_done(category_url):
+    return bool(_state.get(category_url, {}).get("done"))
+
+
+def finish():
+    """Cycle completed for every category: drop the checkpoint file."""
+    global _state
+    _state = {}
+    if STATE_FILE and os.path.exists(STATE_FILE):
+        os.remove(STATE_FILE)
@@ -0,0 +1,698 @@
+"""
+Shared MySQL helpers for the Streamlit dashboards and the scraper.
+
+ConnectionPool keeps a few open pymysql connections around so a dashboard
+rerun does not pay for a TCP/TLS handshake, authentication and a probe
+query on every database call. Connections are only pinged when they come
+out of the pool after sitting idle for a while.
+
+daily_source_stats is a rollup of news_articles per (date, sources). The
+scraper refreshes the days it touched after every cycle and the Database
+Overview panels read the rollup instead of scanning news_articles.
+
+Article search is paged with a keyset on (date, id): each page carries the
+(date, id) of its last row and the next page continues strictly after it,
+so deep pages cost the same as the first one. Pages hold list columns plus
+the BPS category computed in SQL; contents are loaded one article at a time.
+
+ResultCache keeps search results in memory for all dashboard sessions. An
+entry is only reused while the rollup watermark of its date range (what
+the scraper last refreshed there) is unchanged.
+
+pdf_articles holds the articles extracted from PDF files, one row per
+(file_hash, position in the extraction); pdf_editions marks which files (SHA-256 of
+the PDF bytes) were extracted completely. Uploading the same file again
+loads it from MySQL instead of sending it to the LLM.
+"""
+import time
+import queue
+import threading
+from collections import Counter, OrderedDict
+
+import pymysql
+
+import bps_utils
+
+POOL_SIZE = 5              # idle connections kept open
+IDLE_CHECK_SECONDS = 30    # ping on checkout only after this much idle time
+SEARCH_PAGE_SIZE = 100     # rows per search results page
+SEARCH_PAGE_SIZES = [100, 500, 1000, 5000]
+STREAM_THRESHOLD = 1000    # pages this large are read through an unbuffered SSDictCursor
+STREAM_CHUNK_SIZE = 500
+SEARCH_COLUMNS = ["id", "date", "title", "reporter", "sources", "links", "bps_category"]
+SEARCH_SCHEMA_VERSION = 1  # bump when the shape of cached search results changes
+RESULT_CACHE_ENTRIES = 256
+RESULT_CACHE_TTL = 900     # seconds
+
+BPS_REFRESH_BATCH = 2000   # rows classified per UPDATE batch by refresh_bps_categories
+SEARCH_EXPORT_COLUMNS = ["id", "date", "title", "contents", "reporter", "sources", "links"]
+
+
+class PooledConnection:
+    """Wraps a pymysql connection; close() hands it back to the pool."""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._conn is not None:
+            self._pool._release(self._conn)
+            self._conn = None
+
+
+class ConnectionPool:
+    """
+    Small thread-safe pool of pymysql connections.
+
+    Streamlit serves every browser session from its own thread, so the pool
+    hands out one connection per caller and never shares a connection
+    between threads. When all pooled connections are busy a new one is
+    opened; at most ``size`` idle connections are kept afterwards.
+    """
+
+    def __init__(self, db_config, size=POOL_SIZE, idle_check=IDLE_CHECK_SECONDS):
+        self.db_config = dict(db_config)
+        self.size = size
+        self.idle_check = idle_check
+        self._idle = queue.LifoQueue()  # most recently used first, stays warm
+        self._lock = threading.Lock()
+
+    def connection(self):
+        """Check out a connection; raises pymysql errors if the server is unreachable."""
+        while True:
+            try:
+                conn, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return PooledConnection(self, pymysql.connect(**self.db_config))
+
+            if not conn.open:
+                continue
+            if time.monotonic() - released_at < self.idle_check:
+                return PooledConnection(self, conn)
+            try:
+                conn.ping(reconnect=True)
+                return PooledConnection(self, conn)
+            except pymysql.err.Error:
+                self._discard(conn)
+
+    def _release(self, conn):
+        try:
+            # End the read snapshot so the next user sees fresh rows
+            conn.rollback()
+        except pymysql.err.Error:
+            self._discard(conn)
+            return
+        with self._lock:
+            if self._idle.qsize() < self.size:
+                self._idle.put((conn, time.monotonic()))
+                return
+        self._discard(conn)
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except pymysql.err.Error:
+            pass
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+
+def ensure_rollup_table(cursor):
+    # updated_at only moves when article_count actually changes (ON UPDATE semantics)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS daily_source_stats (
+            date DATE NOT NULL,
+            sources VARCHAR(255) NOT NULL,
+            article_count INT NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (date, sources)
+        ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+    """)
+
+
+def refresh_daily_source_stats(conn, since=None):
+    """
+    Recount news_articles per (date, sources) from ``since`` onwards.
+
+    Days before ``since`` are left alone, so a normal cycle only touches the
+    few days it scraped. With since=None, or while the rollup is still
+    empty, the whole table is rebuilt. Returns the number of rollup rows
+    inserted or changed.
+    """
+    cursor = conn.cursor()
+    try:
+        ensure_rollup_table(cursor)
+        cursor.execute("SELECT 1 FROM daily_source_stats LIMIT 1")
+        if cursor.fetchone() is None:
+            since = None
+
+        # Articles without a source are counted under '' so the totals stay exact
+        where = "date IS NOT NULL"
+        params = ()
+        if since is not None:
+            where += " AND date >= %s"
+            params = (since,)
+
+        changed = cursor.execute(f"""
+            INSERT INTO daily_source_stats (date, sources, article_count)
+            SELECT date, COALESCE(sources, ''), COUNT(*) FROM news_articles
+            WHERE {where}
+            GROUP BY date, COALESCE(sources, '')
+            ON DUPLICATE KEY UPDATE article_count = VALUES(article_count)
+        """, params)
+
+        # Groups that disappeared (e.g. removed by the duplicate clean-up)
+        stale_where = "WHERE s.date >= %s AND" if since is not None else "WHERE"
+        cursor.execute(f"""
+            DELETE s FROM daily_source_stats s
+            {stale_where} NOT EXISTS (
+                SELECT 1 FROM news_articles n WHERE n.date = s.date AND COALESCE(n.sources, '') = s.sources
+            )
+        """, params)
+        conn.commit()
+        return changed
+    finally:
+        cursor.close()
+
+
+def get_overview_stats(conn):
+    """
+    Totals for the Database Overview panel: article count, date range,
+    per-source counts and latest date. Served from daily_source_stats; falls
+    back to scanning news_articles until the rollup has been built.
+
+    The rollup only holds dated rows, so articles without a date are counted
+    separately (an index lookup on date) and both paths give the same totals.
+    """
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        try:
+            cursor.execute("""
+                SELECT sources, SUM(article_count) AS cnt, MIN(date) AS min_date, MAX(date) AS max_date
+                FROM daily_source_stats GROUP BY sources
+            """)
+            rows = list(cursor.fetchall())
+        except pymysql.err.ProgrammingError:
+            rows = []  # table not created yet
+
+        if rows:
+            cursor.execute("""
+                SELECT COALESCE(sources, '') AS sources, COUNT(*) AS cnt
+                FROM news_articles WHERE date IS NULL GROUP BY COALESCE(sources, '')
+            """)
+            by_source = {row["sources"]: row for row in rows}
+            for undated in cursor.fetchall():
+                row = by_source.get(undated["sources"])
+                if row is None:
+                    rows.append({"sources": undated["sources"], "cnt": undated["cnt"],
+                                 "min_date": None, "max_date": None})
+                else:
+                    row["cnt"] = (row["cnt"] or 0) + undated["cnt"]
+        else:
+            cursor.execute("""
+                SELECT COALESCE(sources, '') AS sources, COUNT(*) AS cnt,
+                       MIN(date) AS min_date, MAX(date) AS max_date
+                FROM news_articles GROUP BY COALESCE(sources, '')
+            """)
+            rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    min_dates = [row["min_date"] for row in rows if row["min_date"] is not None]
+    max_dates = [row["max_date"] for row in rows if row["max_date"] is not None]
+    return {
+        "total_articles": int(sum(row["cnt"] or 0 for row in rows)),
+        "min_date": min(min_dates) if min_dates else None,
+        "latest_date": max(max_dates) if max_dates else None,
+        "sources": {row["sources"]: int(row["cnt"] or 0) for row in rows if row["sources"]},
+    }
+
+
+def ensure_search_index(cursor):
+    """Index used by the keyset pagination (InnoDB appends id to it)."""
+    try:
+        cursor.execute("CREATE INDEX idx_news_articles_date ON news_articles (date)")
+    except pymysql.err.OperationalError as e:
+        if e.args and e.args[0] == 1061:  # Duplicate key name
+            return
+        raise
+
+
+def ensure_bps_category_columns(cursor):
+    """Rule-based BPS code stored per article, with the RULES_VERSION it was computed with."""
+    try:
+        cursor.execute("""
+            ALTER TABLE news_articles
+            ADD COLUMN bps_category VARCHAR(10) DEFAULT NULL,
+            ADD COLUMN bps_rules_version CHAR(12) DEFAULT NULL,
+            ADD INDEX idx_news_articles_bps_rules (bps_rules_version)
+        """)
+    except pymysql.err.OperationalError as e:
+        if e.args and e.args[0] == 1060:  # Duplicate column name
+            return
+        raise
+
+
+def refresh_bps_categories(conn, batch_size=BPS_REFRESH_BATCH):
+    """
+    Classify articles that have no bps_category for the current
+    bps_utils.RULES_VERSION yet (new rows, or all rows after a rule change).
+
+    Runs in the scraper in small batches, so the dashboard aggregates can
+    group by the stored column instead of evaluating every keyword LIKE.
+    Returns the number of rows updated.
+    """
+    version = bps_utils.RULES_VERSION
+    updated = 0
+    cursor = conn.cursor(pymysql.cursors.Cursor)
+    try:
+        while True:
+            cursor.execute(
+                "SELECT id, title, contents FROM news_articles "
+                "WHERE bps_rules_version IS NULL OR bps_rules_version <> %s LIMIT %s",
+                (version, batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            # Same text as LOWER(CONCAT_WS(' ', title, contents)) in the SQL CASE
+            cursor.executemany(
+                "UPDATE news_articles SET bps_category = %s, bps_rules_version = %s WHERE id = %s",
+                [
+                    (bps_utils.classify_text(" ".join(part for part in (title, contents) if part is not None).lower()),
+                     version, article_id)
+                    for article_id, title, contents in rows
+                ]
+            )
+            conn.commit()
+            updated += len(rows)
+        return updated
+    finally:
+        cursor.close()
+
+
+def update_replayed_article(cursor, article):
+    """
+    Replay mode: overwrite the stored row for article["links"] with the
+    re-parsed fields instead of skipping it as a duplicate. bps_category is
+    cleared so refresh_bps_categories classifies the new text.
+    Returns False if the link is not stored yet (caller inserts it).
+    """
+    cursor.execute("SELECT 1 FROM news_articles WHERE links = %s LIMIT 1", (article["links"],))
+    if cursor.fetchone() is None:
+        return False
+    cursor.execute(
+        "UPDATE news_articles SET date = %s, title = %s, contents = %s, reporter = %s, "
+        "bps_category = NULL, bps_rules_version = NULL WHERE links = %s",
+        (article["date"], article["title"], article["contents"], article["reporter"], article["links"])
+    )
+    return True
+
+
+def _search_filters(start_date, end_date, keywords):
+    where, params = ["1=1"], []
+    if start_date:
+        where.append("date >= %s")
+        params.append(start_date.strftime('%Y-%m-%d'))
+    if end_date:
+        where.append("date <= %s")
+        params.append(end_date.strftime('%Y-%m-%d'))
+    if keywords:
+        where.append("(" + " OR ".join("(title LIKE %s OR contents LIKE %s)" for _ in keywords) + ")")
+        for keyword in keywords:
+            params.extend([f'%{keyword}%', f'%{keyword}%'])
+    return " AND ".join(where), params
+
+
+def search_articles_page(conn, start_date, end_date, keywords, after=None, limit=SEARCH_PAGE_SIZE, stream=None):
+    """
+    One page of search results, newest first, without ``contents``.
+
+    ``after`` is the (date, id) of the last row of the previous page (None
+    for the first page). Returns (columns, has_more) where columns maps each
+    name in SEARCH_COLUMNS to a list, ready for pd.DataFrame(columns).
+
+    With ``stream`` (default: pages of STREAM_THRESHOLD rows or more) rows
+    come through an SSDictCursor in chunks and are appended to the column
+    lists as they arrive, so the full page never exists as a list of dicts.
+    """
+    where, params = _search_filters(start_date, end_date, keywords)
+    if after is not None:
+        after_date, after_id = after
+        where += " AND (date < %s OR (date = %s AND id < %s))"
+        params.extend([after_date, after_date, after_id])
+
+    # Stored bps_category; the keyword CASE only runs for rows not classified with the current rules
+    case_expr, case_params = bps_utils.case_sql("LOWER(CONCAT_WS(' ', title, contents))")
+    query = """
+        SELECT id, date, title, reporter, sources, links, {bps_expr} AS bps_category
+        FROM news_articles
+        WHERE {where}
+        ORDER BY date DESC, id DESC
+        LIMIT %s
+    """
+    stored_expr = f"CASE WHEN bps_rules_version = %s THEN bps_category ELSE {case_expr} END"
+    if stream is None:
+        stream = limit >= STREAM_THRESHOLD
+    columns = {name: [] for name in SEARCH_COLUMNS}
+    cursor = conn.cursor(pymysql.cursors.SSDictCursor if stream else pymysql.cursors.DictCursor)
+    try:
+        try:
+            cursor.execute(query.format(bps_expr=stored_expr, where=where),
+                           [bps_utils.RULES_VERSION] + case_params + params + [limit + 1])
+        except pymysql.err.OperationalError as e:
+            if not (e.args and e.args[0] == 1054):  # Unknown column: scraper has not added it yet
+                raise
+            cursor.execute(query.format(bps_expr=case_expr, where=where), case_params + params + [limit + 1])
+        while True:
+            rows = cursor.fetchmany(STREAM_CHUNK_SIZE) if stream else cursor.fetchall()
+            if not rows:
+                break
+            for name, values in columns.items():
+                values.extend(row[name] for row in rows)
+            if not stream:
+                break
+    finally:
+        cursor.close()
+
+    has_more = len(columns["id"]) > limit
+    if has_more:
+        for values in columns.values():
+            del values[limit:]
+    return columns, has_more
+
+
+def search_summary(conn, start_date, end_date, keywords):
+    """Total count, date range and number of sources over all matching rows."""
+    where, params = _search_filters(start_date, end_date, keywords)
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute(f"""
+            SELECT COUNT(*) AS total, MIN(date) AS min_date, MAX(date) AS max_date,
+                   COUNT(DISTINCT NULLIF(sources, '')) AS source_count
+            FROM news_articles WHERE {where}
+        """, params)
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def get_article_contents(conn, article_id):
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute("SELECT contents FROM news_articles WHERE id = %s", (article_id,))
+        row = cursor.fetchone()
+        return row["contents"] if row else None
+    finally:
+        cursor.close()
+
+
+def ensure_pdf_articles_table(cursor):
+    # pdf_editions has one row per completely extracted PDF file (identified by the SHA-256 of
+    # its bytes); position = order in the extraction result, so articles sharing a title
+    # (or both untitled) on one page stay separate rows; page = first page of the article,
+    # pages = all pages after merging ("3,4")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_editions (
+            file_hash CHAR(64) NOT NULL PRIMARY KEY,
+            sources VARCHAR(255) NOT NULL,
+            edition_date DATE DEFAULT NULL,
+            article_count INT NOT NULL,
+            extracted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            KEY idx_pdf_editions_edition (sources, edition_date)
+        ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_articles (
+            id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            file_hash CHAR(64) NOT NULL,
+            sources VARCHAR(255) NOT NULL,
+            edition_date DATE DEFAULT NULL,
+            position SMALLINT NOT NULL,
+            page SMALLINT NOT NULL,
+            pages VARCHAR(64) NOT NULL,
+            title TEXT,
+            contents LONGTEXT,
+            category VARCHAR(50),
+            web_article_id INT DEFAULT NULL,
+            links TEXT,
+            UNIQUE KEY unique_pdf_article (file_hash, position),
+            KEY idx_pdf_articles_edition (sources, edition_date)
+        ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+    """)
+
+
+def replace_pdf_edition(conn, file_hash, sources, edition_date, articles):
+    """
+    Store the complete extraction of one PDF file, replacing what was stored
+    for it before, in a single transaction.
+
+    ``articles`` are dicts with judul, konten, kategori, halaman and
+    optionally web_article_id / links. An empty list is stored too (the
+    file has no articles), so it is not sent to the LLM again.
+    """
+    rows = []
+    for position, article in enumerate(articles):
+        pages = str(article["halaman"])
+        rows.append((
+            file_hash, sources, edition_date, position, int(pages.split(",")[0]), pages,
+            article["judul"], article["konten"], article["kategori"],
+            article.get("web_article_id"), article.get("links")
+        ))
+
+    cursor = conn.cursor()
+    try:
+        # DDL commits implicitly, so it runs before the transaction starts
+        ensure_pdf_articles_table(cursor)
+        conn.begin()
+        cursor.execute("DELETE FROM pdf_articles WHERE file_hash = %s", (file_hash,))
+        if rows:
+            # pymysql rewrites executemany of INSERT ... VALUES into multi-row statements
+            cursor.executemany("""
+                INSERT INTO pdf_articles
+                    (file_hash, sources, edition_date, position, page, pages, title, contents, category,
+                     web_article_id, links)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, rows)
+        cursor.execute("""
+            REPLACE INTO pdf_editions (file_hash, sources, edition_date, article_count)
+            VALUES (%s, %s, %s, %s)
+        """, (file_hash, sources, edition_date, len(rows)))
+        conn.commit()
+        return len(rows)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def get_pdf_edition(conn, file_hash):
+    """
+    Stored articles of one completely extracted PDF file in extraction order, or
+    None when that exact file was never fully extracted.
+    """
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        ensure_pdf_articles_table(cursor)
+        cursor.execute("SELECT article_count FROM pdf_editions WHERE file_hash = %s", (file_hash,))
+        if cursor.fetchone() is None:
+            return None
+        cursor.execute(
+            "SELECT sources, pages, title, contents, category, web_article_id, links FROM pdf_articles "
+            "WHERE file_hash = %s ORDER BY position",
+            (file_hash,)
+        )
+        return list(cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def get_articles_for_matching(conn, sources, start_date, end_date):
+    """(id, title, contents, links) rows of one source in a date range, for the PDF web cross-check."""
+    cursor = conn.cursor(pymysql.cursors.Cursor)
+    try:
+        cursor.execute(
+            "SELECT id, title, contents, links FROM news_articles "
+            "WHERE sources = %s AND date BETWEEN %s AND %s",
+            (sources, start_date, end_date)
+        )
+        return list(cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def search_aggregates(conn, start_date, end_date, keywords):
+    """
+    Chart data for all rows matching the search filters, grouped in MySQL.
+
+    Returns {"sources": [(source, count)], "bps": [(code, count)],
+    "days": [(date, count)]}; sources and BPS codes are sorted by count.
+
+    BPS codes come from the bps_category column filled by the scraper; only
+    rows not classified with the current rules yet go through the SQL CASE.
+    """
+    where, params = _search_filters(start_date, end_date, keywords)
+    case_expr, case_params = bps_utils.case_sql("t.txt")
+    version = bps_utils.RULES_VERSION
+    # Plain tuples regardless of the connection's default (the apps use DictCursor)
+    cursor = conn.cursor(pymysql.cursors.Cursor)
+    try:
+        cursor.execute(f"""
+            SELECT sources, COUNT(*) FROM news_articles
+            WHERE {where} AND sources IS NOT NULL
+            GROUP BY sources ORDER BY COUNT(*) DESC
+        """, params)
+        by_source = list(cursor.fetchall())
+
+        by_bps = Counter()
+        unclassified = "(bps_rules_version IS NULL OR bps_rules_version <> %s)"
+        unclassified_params = [version]
+        try:
+            cursor.execute(f"""
+                SELECT bps_category, COUNT(*) FROM news_articles
+                WHERE {where} AND bps_rules_version = %s
+                GROUP BY bps_category
+            """, params + [version])
+            by_bps.update(dict(cursor.fetchall()))
+        except pymysql.err.OperationalError as e:
+            if not (e.args and e.args[0] == 1054):  # Unknown column: scraper has not added it yet
+                raise
+            unclassified, unclassified_params = "1=1", []
+
+        cursor.execute(f"""
+            SELECT {case_expr} AS bps_category, COUNT(*) AS cnt
+            FROM (
+                SELECT LOWER(CONCAT_WS(' ', title, contents)) AS txt
+                FROM news_articles WHERE {where} AND {unclassified}
+            ) AS t
+            GROUP BY bps_category
+        """, case_params + params + unclassified_params)
+        for code, count in cursor.fetchall():
+            by_bps[code] += count
+        by_bps = by_bps.most_common()
+
+        cursor.execute(f"""
+            SELECT date, COUNT(*) FROM news_articles
+            WHERE {where} AND date IS NOT NULL
+            GROUP BY date ORDER BY date
+        """, params)
+        by_day = list(cursor.fetchall())
+    finally:
+        cursor.close()
+
+    return {"sources": by_source, "bps": by_bps, "days": by_day}
+
+
+def iter_search_export(conn, start_date, end_date, keywords, chunk_size=2000):
+    """
+    Yield all rows matching the search filters (SEARCH_EXPORT_COLUMNS) in
+    lists of ``chunk_size`` tuples, read through an unbuffered SSCursor so
+    the client never holds more than one chunk.
+    """
+    where, params = _search_filters(start_date, end_date, keywords)
+    cursor = conn.cursor(pymysql.cursors.SSCursor)
+    try:
+        cursor.execute(
+            f"SELECT {', '.join(SEARCH_EXPORT_COLUMNS)} FROM news_articles "
+            f"WHERE {where} ORDER BY date DESC, id DESC", params
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+    finally:
+        # SSCursor.close() drains unread rows so the connection can be reused
+        cursor.close()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a TTL, shared by all dashboard sessions.
+
+    Each entry remembers the watermark it was computed under; a lookup with
+    a different watermark treats the entry as stale and recomputes it.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_ENTRIES, ttl=RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, watermark, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, stored_watermark, value = entry
+                if now - stored_at < self.ttl and stored_watermark == watermark:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+
+        # Computed outside the lock so a slow query does not block other sessions
+        value = compute()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), watermark, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def search_cache_key(kind, start_date, end_date, keywords, *extra):
+    """Cache key for a search: same filters in any keyword order/case give the same key."""
+    normalized = tuple(sorted({k.strip().lower() for k in (keywords or []) if k and k.strip()}))
+    return (kind, start_date, end_date, normalized, SEARCH_SCHEMA_VERSION, bps_utils.RULES_VERSION) + extra
+
+
+def range_watermark(conn, start_date, end_date):
+    """
+    State of daily_source_stats for a date range; changes when the scraper's
+    post-cycle refresh adds, recounts or removes days in that range.
+    """
+    where, params = ["1=1"], []
+    if start_date:
+        where.append("date >= %s")
+        params.append(start_date)
+    if end_date:
+        where.append("date <= %s")
+        params.append(end_date)
+    cursor = conn.cursor(pymysql.cursors.Cursor)
+    try:
+        cursor.execute(
+            "SELECT MAX(updated_at), COUNT(*), SUM(article_count) FROM daily_source_stats WHERE "
+            + " AND ".join(where), params
+        )
+        return tuple(cursor.fetchone())
+    except pymysql.err.ProgrammingError:
+        return None  # rollup not created yet, entries expire by TTL only
+    finally:
+        cursor.close()
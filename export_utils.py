@@ -0,0 +1,140 @@
+"""
+On-demand file exports for the dashboards.
+
+Exports are only built when the user asks for one and are written chunk by
+chunk into a temporary file, so memory stays at one chunk of rows however
+large the export is. Web search exports stream straight from MySQL through
+an unbuffered server-side cursor (see db_utils.iter_search_export).
+
+Parquet needs pyarrow; the other formats only use the standard library.
+"""
+import os
+import csv
+import gzip
+import json
+import tempfile
+
+import bps_utils
+import db_utils
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+CHUNK_SIZE = 2000
+
+# label -> (file extension, mime type)
+FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "JSON": (".json", "application/json"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+SEARCH_EXPORT_COLUMNS = db_utils.SEARCH_EXPORT_COLUMNS + ["bps_category"]
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt != "Parquet" or PYARROW_AVAILABLE]
+
+
+def _search_schema():
+    fields = [pa.field(name, pa.string()) for name in SEARCH_EXPORT_COLUMNS]
+    fields[0] = pa.field("id", pa.int64())
+    fields[1] = pa.field("date", pa.date32())
+    return pa.schema(fields)
+
+
+def _write_csv(f, chunks, columns):
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+
+
+def _write_json(f, chunks, columns):
+    f.write("[")
+    first = True
+    for rows in chunks:
+        for row in rows:
+            f.write("\n" if first else ",\n")
+            f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str))
+            first = False
+    f.write("\n]\n")
+
+
+def _write_parquet(path, chunks, columns, schema=None):
+    writer = None
+    try:
+        for rows in chunks:
+            if not rows:
+                continue
+            data = list(zip(*rows))
+            if schema is None:
+                # Infer from the first chunk; all-empty columns become strings
+                inferred = [pa.array(col) for col in data]
+                schema = pa.schema([
+                    pa.field(name, pa.string() if arr.type == pa.null() else arr.type)
+                    for name, arr in zip(columns, inferred)
+                ])
+            table = pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(data, schema)], schema=schema
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema, compression="snappy")
+            writer.write_table(table)
+        if writer is None and schema is not None:
+            writer = pq.ParquetWriter(path, schema, compression="snappy")  # empty but valid file
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_chunks(chunks, columns, fmt, prefix, schema=None):
+    """Write an iterable of row-tuple lists to a new temp file; returns its path."""
+    suffix, _ = FORMATS[fmt]
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=suffix)
+    os.close(fd)
+    try:
+        if fmt == "CSV":
+            with open(path, "w", encoding="utf-8-sig", newline="") as f:
+                _write_csv(f, chunks, columns)
+        elif fmt == "CSV (gzip)":
+            with gzip.open(path, "wt", encoding="utf-8-sig", newline="") as f:
+                _write_csv(f, chunks, columns)
+        elif fmt == "JSON":
+            with open(path, "w", encoding="utf-8") as f:
+                _write_json(f, chunks, columns)
+        elif fmt == "Parquet":
+            if not PYARROW_AVAILABLE:
+                raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+            _write_parquet(path, chunks, columns, schema)
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def export_search(conn, start_date, end_date, keywords, fmt):
+    """Export every article matching the search filters, contents included."""
+    def chunks():
+        for rows in db_utils.iter_search_export(conn, start_date, end_date, keywords, CHUNK_SIZE):
+            # Same classification as the results page, contents are at hand here anyway
+            yield [row + (bps_utils.classify_text(f"{row[2] or ''} {row[3] or ''}".lower()),) for row in rows]
+
+    schema = _search_schema() if fmt == "Parquet" and PYARROW_AVAILABLE else None
+    return write_chunks(chunks(), SEARCH_EXPORT_COLUMNS, fmt, "web_articles_", schema)
+
+
+def export_dataframe(df, fmt, prefix):
+    """Export a DataFrame already held in the session (e.g. PDF results) in chunks."""
+    def chunks():
+        for start in range(0, len(df), CHUNK_SIZE):
+            yield list(df.iloc[start:start + CHUNK_SIZE].itertuples(index=False, name=None))
+
+    return write_chunks(chunks(), [str(c) for c in df.columns], fmt, prefix)
@@ -0,0 +1,352 @@
+"""
+Shared HTTP fetch layer for the scraper_* modules.
+
+Article pages are downloaded on a small thread pool and the raw bytes are
+handed to a process pool where the per-source ``parse_article`` extractors
+run, so BeautifulSoup parsing no longer blocks the next download. Results
+come back to the caller (the single DB writer in each ``fetch_articles``)
+in the same order as the links on the list page.
+
+Every page fetched over the network can also be kept in a PageArchive
+(gzip files addressed by SHA-256 plus an SQLite index keyed by URL and
+fetch time). In replay mode get() serves pages from that archive instead
+of the network, so extractors can be re-run over old crawls offline.
+
+List pages can be fetched conditionally: the ETag / Last-Modified of the
+last processed copy is kept per URL in a ValidatorStore and sent back as
+If-None-Match / If-Modified-Since, so an unchanged page costs a 304.
+"""
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Defaults keep the old behaviour (one download at a time, parsing inline).
+# scraper.py raises these for a full crawl via configure().
+DOWNLOAD_WORKERS = 1
+PARSE_WORKERS = 0  # 0 = parse in the downloading thread, no process pool
+
+REPLAY = False  # serve pages from the archive only, no network traffic
+CONDITIONAL = True  # send stored validators on get(..., conditional=True)
+
+_local = threading.local()
+_host_lock = threading.Lock()
+_host_next_request = {}  # host -> earliest monotonic time of the next request
+_process_pool = None
+_archive = None
+_validators = None
+
+
+class PageArchive:
+    """Content-addressed store of raw HTML responses."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS fetches (
+                url TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                encoding TEXT,
+                content_type TEXT
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_fetches_url ON fetches (url, fetched_at)")
+        self._db.commit()
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.html.gz")
+
+    def store(self, url, resp):
+        """Save a response body (deduplicated by content) and index it."""
+        digest = hashlib.sha256(resp.content).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(resp.content)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO fetches (url, fetched_at, sha256, status, encoding, content_type) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, datetime.now().isoformat(timespec="seconds"), digest, resp.status_code,
+                 resp.encoding, resp.headers.get("Content-Type"))
+            )
+            self._db.commit()
+
+    def lookup(self, url):
+        """Return the most recent archived response for url, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sha256, status, encoding, content_type FROM fetches "
+                "WHERE url = ? ORDER BY fetched_at DESC LIMIT 1",
+                (url,)
+            ).fetchone()
+        if not row:
+            return None
+        digest, status, encoding, content_type = row
+        with gzip.open(self._object_path(digest), "rb") as f:
+            content = f.read()
+        return ArchivedResponse(url, status, content, encoding, {"Content-Type": content_type or ""})
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ArchivedResponse:
+    """The subset of requests.Response the scrapers use, backed by the archive."""
+
+    def __init__(self, url, status_code, content, encoding=None, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.reason = "Not in archive" if status_code == 404 and not content else ""
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} {self.reason} for url: {self.url}", response=self)
+
+
+class ValidatorStore:
+    """
+    Per-URL ETag / Last-Modified values for conditional list-page requests.
+
+    New validators are held as pending until the caller asks for the next
+    conditional page (or calls flush()), i.e. once the previous page has
+    been fully processed. A cycle that dies mid-page therefore fetches
+    that page in full again next time instead of getting a 304 for it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def lookup(self, url):
+        """Return (etag, last_modified) stored for url, or None."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT etag, last_modified FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+
+    def remember(self, url, etag, last_modified):
+        with self._lock:
+            self._pending[url] = (etag, last_modified)
+
+    def flush(self):
+        """Persist pending validators."""
+        with self._lock:
+            if not self._pending:
+                return
+            now = datetime.now().isoformat(timespec="seconds")
+            self._db.executemany(
+                "INSERT INTO validators (url, etag, last_modified, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, "
+                "last_modified = excluded.last_modified, updated_at = excluded.updated_at",
+                [(url, etag, last_modified, now) for url, (etag, last_modified) in self._pending.items()]
+            )
+            self._db.commit()
+            self._pending.clear()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+
+def configure(download_workers=None, parse_workers=None, archive_dir=None, replay=None,
+              validator_db=None, conditional=None):
+    """Set pipeline sizes, archive, replay mode and the conditional GET store for this process."""
+    global DOWNLOAD_WORKERS, PARSE_WORKERS, REPLAY, CONDITIONAL, _archive, _validators
+    if download_workers is not None:
+        DOWNLOAD_WORKERS = max(1, int(download_workers))
+    if parse_workers is not None:
+        PARSE_WORKERS = max(0, int(parse_workers))
+    if replay is not None:
+        REPLAY = bool(replay)
+    if archive_dir is not None and (_archive is None or _archive.root != archive_dir):
+        if _archive is not None:
+            _archive.close()
+        _archive = PageArchive(archive_dir)
+    if REPLAY and _archive is None:
+        raise ValueError("Replay mode needs an archive_dir")
+    if conditional is not None:
+        CONDITIONAL = bool(conditional)
+    if validator_db is not None and (_validators is None or _validators.path != validator_db):
+        if _validators is not None:
+            _validators.close()
+        _validators = ValidatorStore(validator_db)
+
+
+def shutdown():
+    """Stop the parse process pool and save validators (call once at the end of a cycle)."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True)
+        _process_pool = None
+    if _validators is not None:
+        _validators.flush()
+
+
+def _session():
+    # requests.Session is not guaranteed thread-safe, keep one per thread
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _local.session = session
+    return session
+
+
+def _get_process_pool():
+    global _process_pool
+    if PARSE_WORKERS <= 0:
+        return None
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _process_pool
+
+
+def get(url, headers=None, timeout=10, conditional=False):
+    """
+    GET a URL through the shared keep-alive session and return the response.
+
+    Successful responses are written to the archive when one is configured;
+    in replay mode the archived copy is returned instead (404 if missing).
+
+    With ``conditional=True`` the stored validators for url are sent and the
+    response may be a 304; callers must check ``status_code`` themselves
+    because raise_for_status() does not treat 304 as an error.
+    """
+    if REPLAY:
+        archived = _archive.lookup(url)
+        return archived if archived is not None else ArchivedResponse(url, 404, b"")
+
+    if conditional and _validators is not None:
+        # The previous conditional page has been processed by now
+        _validators.flush()
+        stored = _validators.lookup(url) if CONDITIONAL else None
+        if stored:
+            etag, last_modified = stored
+            headers = dict(headers or {})
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+    resp = _session().get(url, headers=headers, timeout=timeout)
+    if conditional and _validators is not None and resp.status_code == 200:
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            _validators.remember(url, etag, last_modified)
+    if _archive is not None and resp.status_code == 200:
+        try:
+            _archive.store(url, resp)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ Failed to archive {url}: {e}")
+    return resp
+
+
+def _wait_for_host(url, delay):
+    """
+    Per-host rate limit shared by all download workers: requests to one host
+    start at least ``delay`` seconds apart, however many workers are running.
+    """
+    host = urlsplit(url).netloc
+    with _host_lock:
+        now = time.monotonic()
+        start = max(now, _host_next_request.get(host, now))
+        _host_next_request[host] = start + delay
+    if start > now:
+        time.sleep(start - now)
+
+
+def _parse_raw(parse_func, raw, encoding, url):
+    """Process-pool entry point: decode raw bytes and run the extractor."""
+    html = raw.decode(encoding or "utf-8", errors="replace")
+    return parse_func(html, url)
+
+
+def _download_and_submit(pool, parse_func, url, headers, timeout, delay):
+    """Download one page and queue it for parsing; returns a future or a result."""
+    if delay and not REPLAY:
+        _wait_for_host(url, delay)  # polite delay per host, not per download worker
+    try:
+        resp = get(url, headers=headers, timeout=timeout)
+        resp.raise_for_status()
+        raw, encoding = resp.content, resp.encoding
+    except requests.RequestException as e:
+        print(f"❌ Failed {url}: {e}")
+        return None
+
+    if pool is None:
+        return _parse_raw(parse_func, raw, encoding, url)
+    return pool.submit(_parse_raw, parse_func, raw, encoding, url)
+
+
+def map_articles(parse_func, urls, headers=None, timeout=10, delay=0):
+    """
+    Download ``urls`` and run ``parse_func(html, url)`` on each page.
+
+    ``parse_func`` must be a module-level function so it can be sent to the
+    parse process pool. Yields ``(url, result)`` in input order; ``result``
+    is None when the download or the extractor failed.
+    """
+    urls = list(urls)
+    if not urls:
+        return
+
+    pool = _get_process_pool()
+    downloads = ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(urls)))
+    try:
+        pending = [
+            downloads.submit(_download_and_submit, pool, parse_func, url, headers, timeout, delay)
+            for url in urls
+        ]
+        for url, download in zip(urls, pending):
+            try:
+                result = download.result()
+                if isinstance(result, Future):
+                    result = result.result()
+            except Exception as e:
+                print(f"❌ Failed to parse article {url}: {e}")
+                result = None
+            yield url, result
+    finally:
+        # Caller may stop early (e.g. older articles reached)
+        downloads.shutdown(wait=True, cancel_futures=True)
@@ -1,8 +1,12 @@
 import os
 import json
 import re
+import sqlite3
+import hashlib
+import threading
 from datetime import datetime
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
 from pathlib import Path
 
 # Optional dotenv loading
@@ -15,13 +19,143 @@ except ImportError:
 # LangChain imports
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.callbacks import BaseCallbackHandler
 from pydantic import BaseModel, Field
 import traceback
-
-# Azure OpenAI imports
-from langchain_openai import AzureChatOpenAI
+import fitz  # PyMuPDF, untuk koordinat blok teks
+
+# LLM backend (Azure OpenAI atau Ollama)
+import llm_backends
+import bps_utils
+import db_utils
+
+# Jumlah request LLM yang boleh berjalan bersamaan per PDF (1 = serial seperti sebelumnya)
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+# Cache respons LLM (SQLite); string kosong = cache dimatikan
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite")
+
+# Sidik jari blok boilerplate (masthead, iklan, header berulang); string kosong = filter dimatikan
+BOILERPLATE_DB_PATH = os.getenv("BOILERPLATE_DB_PATH", "boilerplate.sqlite")
+BOILERPLATE_MIN_EDITIONS = 3  # blok yang muncul di >= sekian edisi dari sumber yang sama
+BOILERPLATE_MIN_PAGES = 3     # blok yang muncul di >= sekian halaman dalam satu edisi
+BOILERPLATE_MIN_BLOCK_CHARS = 8
+BOILERPLATE_RETENTION_DAYS = 90  # blok yang hanya terlihat sekali dan lebih tua dari ini dihapus
+# Penanda artikel bersambung tidak pernah dibuang (dipakai prompt dan merge_continued_articles)
+CONTINUATION_MARKERS = re.compile(r"bersambung|sambungan|lanjutan|dari\s+hal|ke\s+hal", re.IGNORECASE)
+
+# Jumlah proses untuk ekstraksi teks PDF (PyMuPDF) saat memproses banyak file sekaligus
+DEFAULT_LOAD_WORKERS = int(os.getenv("PDF_LOAD_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+# Budget token per request (sama dengan setting Ollama di config.ini)
+DEFAULT_TOKEN_LIMIT = int(os.getenv("OLLAMA_TOKEN_LIMIT", "16000"))
+DEFAULT_TOKEN_SAFETY_RATIO = float(os.getenv("TOKEN_SAFETY_RATIO", "0.90"))
+CHARS_PER_TOKEN = 4  # perkiraan kasar, tanpa tokenizer
+
+# "compact" = template tanpa indentasi, garis pemisah dan baris kosong berulang; "full" = apa adanya
+DEFAULT_PROMPT_VARIANT = os.getenv("EXTRACTION_PROMPT_VARIANT", "compact")
+
+# Jarak vertikal (point) antar blok yang dianggap batas artikel dalam satu kolom
+REGION_GAP_POINTS = 18
+# Blok masuk ke kolom yang sama jika overlap horizontalnya >= rasio ini dari lebar yang lebih lebar
+# (judul yang melintasi beberapa kolom jadi region sendiri, tidak menyatukan kolom-kolom di bawahnya)
+COLUMN_OVERLAP_RATIO = 0.5
+
+
+def estimate_tokens(text: str) -> int:
+    """Perkiraan jumlah token dari panjang teks"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def compact_prompt_text(template: str) -> str:
+    """Ringkas template prompt: buang indentasi, garis '=====' dan baris kosong berulang"""
+    lines = []
+    for line in template.splitlines():
+        line = line.strip()
+        if line and set(line) == {"="}:
+            continue
+        if not line and (not lines or not lines[-1]):
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def group_text_blocks(blocks: list) -> List[List[str]]:
+    """
+    Kelompokkan blok teks PyMuPDF (page.get_text("blocks")) menjadi region artikel
+
+    Blok dibagi per kolom berdasarkan overlap horizontal, lalu di dalam kolom
+    dipisah menjadi region baru bila jarak vertikalnya lebih dari
+    REGION_GAP_POINTS. Urutan hasil: kolom kiri ke kanan, atas ke bawah.
+    Setiap region adalah list teks bloknya.
+    """
+    text_blocks = [b for b in blocks if b[6] == 0 and b[4].strip()]
+
+    columns = []  # [x0, x1, blocks]
+    for block in sorted(text_blocks, key=lambda b: (b[0], b[1])):
+        x0, x1 = block[0], block[2]
+        for column in columns:
+            overlap = min(x1, column[1]) - max(x0, column[0])
+            wider = max(x1 - x0, column[1] - column[0]) or 1
+            if overlap / wider >= COLUMN_OVERLAP_RATIO:
+                column[2].append(block)
+                break
+        else:
+            columns.append([x0, x1, [block]])
+
+    regions = []
+    for _, _, column_blocks in sorted(columns, key=lambda c: c[0]):
+        current = []
+        last_bottom = None
+        for block in sorted(column_blocks, key=lambda b: b[1]):
+            if current and block[1] - last_bottom > REGION_GAP_POINTS:
+                regions.append(current)
+                current = []
+            current.append(block[4].strip())
+            last_bottom = block[3]
+        if current:
+            regions.append(current)
+    return regions
+
+
+def group_text_regions(blocks: list) -> List[str]:
+    """Teks region artikel (lihat group_text_blocks), blok dalam satu region dipisah baris baru"""
+    return ["\n".join(region) for region in group_text_blocks(blocks)]
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 isi file (identitas PDF untuk PdfArticleStore)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_pdf_documents(pdf_path: str) -> list:
+    """
+    Baca teks semua halaman PDF dengan PyMuPDF (fungsi level modul agar bisa dijalankan di process pool)
+
+    Setiap halaman menjadi satu Document; region artikelnya (lihat
+    group_text_regions) disimpan di metadata["regions"] untuk chunking dan
+    teks per blok di metadata["region_blocks"] untuk BoilerplateFilter.
+    """
+    documents = []
+    with fitz.open(pdf_path) as pdf:
+        total_pages = len(pdf)
+        for page_index, page in enumerate(pdf):
+            region_blocks = group_text_blocks(page.get_text("blocks"))
+            regions = ["\n".join(region) for region in region_blocks]
+            documents.append(Document(
+                page_content="\n\n".join(regions),
+                metadata={"source": pdf_path, "page": page_index, "total_pages": total_pages,
+                          "regions": regions, "region_blocks": region_blocks}
+            ))
+    return documents
 
 # Pydantic models for structured output
 class NewsArticle(BaseModel):
@@ -32,6 +166,11 @@ class NewsArticle(BaseModel):
     halaman: int = Field(description="Nomor halaman di mana artikel ditemukan")
     sumber: str = Field(description="Sumber koran")
 
+class LinkedNewsArticle(NewsArticle):
+    """Artikel PDF yang sudah ada di news_articles (hasil cross-check web), tidak diekstrak LLM"""
+    web_article_id: int = Field(description="id artikel di news_articles")
+    links: str = Field(default="", description="URL artikel web")
+
 class NewsArticlesList(BaseModel):
     """Wrapper untuk list of NewsArticle"""
     articles: List[NewsArticle] = Field(description="Daftar artikel berita")
@@ -42,41 +181,411 @@ class FileDescription(BaseModel):
     main_topics: List[str] = Field(description="Topik utama yang dibahas dalam file")
     dominant_sectors: List[str] = Field(description="Sektor BPS yang dominan dalam file")
 
+class TokenUsage(BaseCallbackHandler):
+    """
+    Penghitung pemakaian token LLM, dipasang lewat config={"callbacks": [...]}
+
+    Satu instance per file PDF; chunk yang dilayani dari cache dihitung
+    terpisah karena tidak memakai token.
+    """
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.requests = 0
+        self.cached_requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.completion_tokens
+
+    def on_llm_end(self, response, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        with self._lock:
+            self.prompt_tokens += usage.get("prompt_tokens", 0) or 0
+            self.completion_tokens += usage.get("completion_tokens", 0) or 0
+            self.requests += 1
+
+    def add_cached(self):
+        with self._lock:
+            self.cached_requests += 1
+
+    def as_dict(self):
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "requests": self.requests,
+            "cached_requests": self.cached_requests,
+        }
+
+
+class BoilerplateFilter:
+    """
+    Buang blok berulang (masthead, header halaman, iklan tetap) sebelum chunking.
+
+    Yang di-hash adalah blok teks PyMuPDF utuh, bukan baris: satu baris kolom
+    koran yang sempit (nama, nama tempat, frasa umum) sering berulang di isi
+    artikel, sedangkan satu paragraf utuh hanya berulang bila memang
+    boilerplate. Teks blok dinormalisasi (huruf kecil, angka -> 0 agar tanggal
+    dan nomor halaman tidak membedakan) lalu di-hash. Blok dianggap
+    boilerplate jika muncul di BOILERPLATE_MIN_PAGES halaman dalam edisi yang
+    sama, atau sudah terlihat di BOILERPLATE_MIN_EDITIONS edisi sebelumnya dari
+    sumber yang sama (disimpan di SQLite). Blok dengan penanda bersambung
+    (CONTINUATION_MARKERS) tidak pernah dibuang.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS block_editions (
+                source TEXT NOT NULL,
+                edition_id TEXT NOT NULL,
+                seen_at TEXT NOT NULL,
+                PRIMARY KEY (source, edition_id)
+            );
+            CREATE TABLE IF NOT EXISTS block_counts (
+                source TEXT NOT NULL,
+                block_hash TEXT NOT NULL,
+                editions INTEGER NOT NULL,
+                last_seen TEXT NOT NULL,
+                PRIMARY KEY (source, block_hash)
+            );
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def block_hash(block: str) -> Optional[str]:
+        """Hash blok yang sudah dinormalisasi, None untuk blok terlalu pendek atau penanda bersambung"""
+        normalized = re.sub(r"\s+", " ", re.sub(r"\d", "0", block.strip().lower()))
+        if len(normalized) < BOILERPLATE_MIN_BLOCK_CHARS or CONTINUATION_MARKERS.search(normalized):
+            return None
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+    def _known_blocks(self, source: str, hashes: set) -> set:
+        known = set()
+        hashes = list(hashes)
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT block_hash FROM block_counts WHERE source = ? AND editions >= ? "
+                    f"AND block_hash IN ({','.join('?' * len(batch))})",
+                    [source, BOILERPLATE_MIN_EDITIONS] + batch
+                ).fetchall()
+                known.update(row[0] for row in rows)
+        return known
+
+    def _record_edition(self, source: str, edition_id: str, hashes: set):
+        """Tambah hitungan edisi untuk setiap blok (satu kali per edisi)"""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            inserted = self._db.execute(
+                "INSERT OR IGNORE INTO block_editions (source, edition_id, seen_at) VALUES (?, ?, ?)",
+                (source, edition_id, now)
+            ).rowcount
+            if inserted:
+                self._db.executemany(
+                    "INSERT INTO block_counts (source, block_hash, editions, last_seen) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT(source, block_hash) DO UPDATE SET editions = editions + 1, last_seen = excluded.last_seen",
+                    [(source, block_hash, now) for block_hash in hashes]
+                )
+                self._db.execute(
+                    "DELETE FROM block_counts WHERE editions = 1 AND last_seen < datetime('now', ?)",
+                    (f"-{BOILERPLATE_RETENTION_DAYS} days",)
+                )
+            self._db.commit()
+
+    def strip(self, source: str, documents: list) -> list:
+        """Return documents dengan blok boilerplate dihapus dari setiap region"""
+        pages = []
+        page_hashes = []
+        for doc in documents:
+            # Tanpa region_blocks (mis. Document dari loader lain) setiap region dianggap satu blok
+            region_blocks = doc.metadata.get("region_blocks") or [
+                [region] for region in (doc.metadata.get("regions") or [doc.page_content])
+            ]
+            blocks = [[(block, self.block_hash(block)) for block in region] for region in region_blocks]
+            pages.append(blocks)
+            page_hashes.append({h for region in blocks for _, h in region if h})
+
+        pages_per_block = {}
+        for hashes in page_hashes:
+            for block_hash in hashes:
+                pages_per_block[block_hash] = pages_per_block.get(block_hash, 0) + 1
+        edition_hashes = set(pages_per_block)
+
+        boilerplate = {h for h, count in pages_per_block.items() if count >= BOILERPLATE_MIN_PAGES}
+        # Sumber 'unknown' bisa berisi koran berbeda, jadi hanya filter dalam satu edisi
+        if source != 'unknown' and edition_hashes:
+            boilerplate |= self._known_blocks(source, edition_hashes)
+
+        stripped_docs = []
+        removed_blocks = 0
+        removed_chars = 0
+        for doc, blocks in zip(documents, pages):
+            region_blocks = []
+            for region in blocks:
+                kept = []
+                for block, block_hash in region:
+                    if block_hash in boilerplate:
+                        removed_blocks += 1
+                        removed_chars += len(block)
+                    elif block.strip():
+                        kept.append(block)
+                if kept:
+                    region_blocks.append(kept)
+            regions = ["\n".join(region).strip() for region in region_blocks]
+            metadata = dict(doc.metadata)
+            metadata["regions"] = regions
+            metadata["region_blocks"] = region_blocks
+            stripped_docs.append(Document(page_content="\n\n".join(regions), metadata=metadata))
+
+        if source != 'unknown' and edition_hashes:
+            edition_id = hashlib.sha256("\n".join(doc.page_content for doc in documents).encode("utf-8")).hexdigest()
+            try:
+                self._record_edition(source, edition_id, edition_hashes)
+            except sqlite3.Error as e:
+                print(f"[WARNING] Failed to record boilerplate fingerprints: {e}")
+
+        print(f"[INFO] Boilerplate filter: removed {removed_blocks} blocks ({removed_chars} chars)")
+        return stripped_docs
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class LLMResponseCache:
+    """
+    Cache hasil LLM yang sudah diparsing, disimpan di SQLite.
+
+    Key adalah hash dari versi prompt (template + format instructions),
+    input chain (teks chunk, halaman), deployment dan temperature, sehingga
+    PDF yang diunggah ulang tidak dikirim lagi ke Azure OpenAI. Perubahan
+    prompt atau model otomatis menghasilkan key baru.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def make_key(kind, prompt_version, inputs, deployment, temperature):
+        payload = json.dumps({
+            "kind": kind,
+            "prompt": prompt_version,
+            "inputs": inputs,
+            "deployment": deployment,
+            "temperature": temperature,
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key, model_cls):
+        """Return the cached model_cls instance for key, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            result = model_cls.model_validate_json(row[0])
+        except ValueError:
+            # Skema model berubah, anggap miss
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key, kind, result):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, kind, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, kind, result.model_dump_json(), datetime.now().isoformat(timespec="seconds"))
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class PdfArticleStore:
+    """
+    Artikel hasil ekstraksi per file PDF di tabel MySQL pdf_articles / pdf_editions.
+
+    File dikenali dari SHA-256 isinya, jadi hanya file yang persis sama yang
+    dimuat ulang (suplemen atau rentang halaman lain dari edisi yang sama
+    tetap diekstrak). Hanya ekstraksi yang lengkap yang disimpan.
+
+    ``connect`` mengembalikan koneksi DB-API (mis. koneksi pool dashboard) dan
+    koneksi ditutup lagi setelah setiap query. Error database hanya dicatat,
+    ekstraksi tetap berjalan lewat LLM.
+    """
+
+    def __init__(self, connect):
+        self.connect = connect
+
+    def load_edition(self, file_hash: str) -> Optional[List[NewsArticle]]:
+        """Artikel file yang sudah tersimpan, atau None bila file belum pernah diekstrak lengkap"""
+        conn = self.connect()
+        if not conn:
+            return None
+        try:
+            rows = db_utils.get_pdf_edition(conn, file_hash)
+        except Exception as e:
+            print(f"[WARNING] Could not read pdf_articles: {e}")
+            return None
+        finally:
+            conn.close()
+        if rows is None:
+            return None
+
+        articles = []
+        for row in rows:
+            # halaman bisa "3,4" untuk artikel bersambung, jadi tanpa validasi pydantic
+            fields = dict(
+                judul=row['title'],
+                konten=row['contents'],
+                kategori=row['category'],
+                halaman=int(row['pages']) if row['pages'].isdigit() else row['pages'],
+                sumber=row['sources']
+            )
+            if row['web_article_id'] is not None:
+                articles.append(LinkedNewsArticle.model_construct(
+                    web_article_id=row['web_article_id'], links=row['links'] or "", **fields
+                ))
+            else:
+                articles.append(NewsArticle.model_construct(**fields))
+        return articles
+
+    def save_edition(self, file_hash: str, source: str, edition_date, articles: List[NewsArticle]):
+        """Ganti artikel tersimpan satu file dengan hasil ekstraksi baru (satu transaksi)"""
+        conn = self.connect()
+        if not conn:
+            return
+        try:
+            db_utils.replace_pdf_edition(conn, file_hash, source, edition_date, [
+                {
+                    'judul': article.judul,
+                    'konten': article.konten,
+                    'kategori': article.kategori,
+                    'halaman': article.halaman,
+                    'web_article_id': getattr(article, 'web_article_id', None),
+                    'links': getattr(article, 'links', None)
+                }
+                for article in articles
+            ])
+            print(f"[INFO] Saved {len(articles)} articles of {source} {edition_date or ''} to pdf_articles")
+        except Exception as e:
+            print(f"[WARNING] Could not save articles to pdf_articles: {e}")
+        finally:
+            conn.close()
+
+
 class NewspaperExtractor:
-    """Kelas untuk mengekstrak artikel berita dari PDF koran menggunakan LangChain dan Azure OpenAI"""
+    """Kelas untuk mengekstrak artikel berita dari PDF koran menggunakan LangChain dan Azure OpenAI / Ollama"""
 
-    def __init__(self, azure_endpoint: str = None, azure_key: str = None, api_version: str = "2024-02-01"):
+    def __init__(self, azure_endpoint: str = None, azure_key: str = None, api_version: str = "2024-02-01",
+                 max_concurrency: int = None, cache_path: str = None,
+                 token_limit: int = None, token_safety_ratio: float = None, prompt_variant: str = None,
+                 backend: str = None, ollama_url: str = None, ollama_model: str = None,
+                 boilerplate_path: str = None, web_matcher=None, article_store: PdfArticleStore = None):
         """
-        Inisialisasi extractor dengan Azure OpenAI
+        Inisialisasi extractor dengan Azure OpenAI atau Ollama
 
         Args:
             azure_endpoint: Azure OpenAI endpoint URL
             azure_key: Azure OpenAI API key
             api_version: API version untuk Azure OpenAI
+            max_concurrency: Maksimal request LLM paralel per PDF (default LLM_MAX_CONCURRENCY)
+            cache_path: File SQLite cache respons LLM (default LLM_CACHE_PATH, "" = tanpa cache)
+            token_limit: Batas token per request (default OLLAMA_TOKEN_LIMIT)
+            token_safety_ratio: Bagian dari token_limit yang boleh dipakai (default TOKEN_SAFETY_RATIO)
+            prompt_variant: "compact" atau "full" (default EXTRACTION_PROMPT_VARIANT)
+            backend: "azure" atau "ollama" (default LLM_BACKEND)
+            ollama_url: Endpoint /api/chat Ollama (default OLLAMA_URL)
+            ollama_model: Model Ollama (default OLLAMA_MODEL)
+            boilerplate_path: File SQLite sidik jari boilerplate (default BOILERPLATE_DB_PATH, "" = tanpa filter)
+            web_matcher: web_match.WebArticleMatcher untuk melewati artikel yang sudah di-scrape dari web
+            article_store: PdfArticleStore; edisi yang sudah diekstrak dimuat dari MySQL tanpa LLM
         """
+        self.backend = (backend or llm_backends.LLM_BACKEND).lower()
         self.azure_endpoint = azure_endpoint or os.getenv("AZURE_OPENAI_ENDPOINT")
         self.azure_key = azure_key or os.getenv("AZURE_OPENAI_API_KEY")
         self.api_version = api_version
+        self.max_concurrency = max(1, int(max_concurrency or DEFAULT_MAX_CONCURRENCY))
+        self.token_limit = int(token_limit or DEFAULT_TOKEN_LIMIT)
+        self.token_safety_ratio = float(token_safety_ratio or DEFAULT_TOKEN_SAFETY_RATIO)
 
-        if not self.azure_endpoint or not self.azure_key:
+        if self.backend == "azure" and (not self.azure_endpoint or not self.azure_key):
             raise ValueError("Azure OpenAI endpoint dan API key harus disediakan atau di-set sebagai environment variables")
 
-        # Inisialisasi Azure OpenAI model
-        self.llm = AzureChatOpenAI(
+        # Inisialisasi model LLM
+        self.temperature = 0.1
+        if self.backend == "ollama":
+            ollama_model = ollama_model or llm_backends.OLLAMA_MODEL
+            self.deployment_name = f"ollama:{ollama_model}"  # dipakai juga di key cache respons
+        else:
+            self.deployment_name = "grok-4-fast-non-reasoning"  # Ganti dengan deployment name Anda
+        self.llm = llm_backends.create_chat_model(
+            self.backend,
+            temperature=self.temperature,
+            token_limit=self.token_limit,
             azure_endpoint=self.azure_endpoint,
-            api_key=self.azure_key,
+            azure_key=self.azure_key,
             api_version=self.api_version,
-            deployment_name="grok-4-fast-non-reasoning",  # Ganti dengan deployment name Anda
-            temperature=0.1,
-            max_tokens=None
+            deployment_name=self.deployment_name,
+            ollama_url=ollama_url,
+            ollama_model=ollama_model
         )
 
+        # Cache respons LLM agar PDF yang sama tidak diproses ulang oleh model
+        cache_path = LLM_CACHE_PATH if cache_path is None else cache_path
+        self.cache = LLMResponseCache(cache_path) if cache_path else None
+
+        # Filter masthead/header/iklan yang berulang antar halaman dan edisi
+        boilerplate_path = BOILERPLATE_DB_PATH if boilerplate_path is None else boilerplate_path
+        self.boilerplate = BoilerplateFilter(boilerplate_path) if boilerplate_path else None
+        self.web_matcher = web_matcher
+        self.article_store = article_store
+
         # Setup parser untuk output terstruktur
         self.parser = PydanticOutputParser(pydantic_object=NewsArticlesList)
 
-        # Setup text splitter untuk memecah dokumen panjang
+        # Prompt, format instructions dan chain ekstraksi dibuat sekali, dipakai semua chunk
+        self.prompt_variant = (prompt_variant or DEFAULT_PROMPT_VARIANT).lower()
+        self.format_instructions = self.parser.get_format_instructions()
+        self.extraction_prompt = self.create_extraction_prompt()
+        self.extraction_chain = self.extraction_prompt | self.llm | self.parser
+        self.prompt_version = hashlib.sha256(
+            (self.extraction_prompt.pretty_repr() + self.format_instructions).encode("utf-8")
+        ).hexdigest()
+
+        # Budget token input per chunk: sisa setelah prompt, dibagi dua karena
+        # output JSON memuat ulang konten artikel dari chunk tersebut
+        self.prompt_tokens = estimate_tokens(self.extraction_prompt.pretty_repr() + self.format_instructions)
+        print(f"[INFO] Extraction prompt ({self.prompt_variant}): ~{self.prompt_tokens} tokens")
+        self.chunk_token_budget = max(500, (int(self.token_limit * self.token_safety_ratio) - self.prompt_tokens) // 2)
+
+        # Text splitter hanya untuk region yang lebih besar dari budget
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=4000,
+            chunk_size=self.chunk_token_budget * CHARS_PER_TOKEN,
             chunk_overlap=200,
             separators=["\n\n", "\n", " ", ""]
         )
@@ -136,23 +645,32 @@ class NewspaperExtractor:
 
         return metadata
 
-    def extract_source_from_pdf_content(self, pdf_path: str) -> str:
+    def extract_source_from_pdf_content(self, pdf_path: str, first_page_content: str = None) -> str:
         """
         Ekstrak sumber koran dari konten PDF, khususnya dari header halaman pertama
         Fokus pada koran-koran Gorontalo yang ada di sistem scraping
 
+        Args:
+            pdf_path: Path file PDF
+            first_page_content: Teks halaman pertama bila PDF sudah dimuat; jika None
+                hanya halaman pertama yang dibaca (lazy_load), bukan seluruh PDF
+
         Returns:
             str: Nama sumber koran atau 'unknown' jika tidak ditemukan
         """
         try:
-            loader = PyMuPDFLoader(pdf_path)
-            documents = loader.load()
+            if first_page_content is None:
+                pages = PyMuPDFLoader(pdf_path).lazy_load()
+                try:
+                    first_page = next(pages, None)
+                finally:
+                    pages.close()
 
-            if not documents:
-                return 'unknown'
+                if first_page is None:
+                    return 'unknown'
 
-            # Ambil halaman pertama
-            first_page_content = documents[0].page_content
+                # Ambil halaman pertama
+                first_page_content = first_page.page_content
 
             # Pattern khusus untuk koran Gorontalo (berdasarkan scraper yang ada)
             gorontalo_newspapers = [
@@ -248,29 +766,53 @@ class NewspaperExtractor:
 
         return 'unknown'
 
-    def load_and_split_pdf(self, pdf_path: str) -> tuple:
+    def load_and_split_pdf(self, pdf_path: str, documents: list = None) -> tuple:
         """
         Load PDF dan split menjadi chunks untuk processing
 
+        Args:
+            pdf_path: Path file PDF
+            documents: Halaman yang sudah dimuat (mis. dari process pool); None = load di sini
+
         Returns:
             tuple: (chunks, metadata)
         """
-        print(f"[INFO] Loading PDF: {pdf_path}")
+        if documents is None:
+            print(f"[INFO] Loading PDF: {pdf_path}")
 
-        # Load PDF menggunakan PyMuPDFLoader
-        loader = PyMuPDFLoader(pdf_path)
-        documents = loader.load()
+            # Load PDF menggunakan PyMuPDFLoader (satu kali, dipakai untuk deteksi sumber, filter dan split)
+            documents = load_pdf_documents(pdf_path)
 
         # Ekstrak metadata dari filename
         metadata = self.extract_metadata_from_filename(pdf_path)
 
-        # Jika source masih 'unknown', coba ekstrak dari konten PDF
+        # Jika source masih 'unknown', coba ekstrak dari header halaman pertama yang sudah dimuat
         if metadata['source'] == 'unknown':
-            content_source = self.extract_source_from_pdf_content(pdf_path)
+            content_source = self.extract_source_from_pdf_content(
+                pdf_path,
+                first_page_content=documents[0].page_content if documents else ""
+            )
             if content_source != 'unknown':
                 metadata['source'] = content_source
                 print(f"[INFO] Source extracted from PDF content: {content_source}")
 
+        # Buang boilerplate sebelum filter halaman, jadi halaman yang hanya berisi masthead/iklan ikut terlewati
+        if self.boilerplate is not None and documents:
+            documents = self.boilerplate.strip(metadata['source'], documents)
+
+        # Region yang sudah ada di news_articles tidak dikirim ke LLM, artikel webnya dipakai langsung
+        metadata['web_matches'] = []
+        if self.web_matcher is not None and documents:
+            kept_pages, metadata['web_matches'] = self.web_matcher.match_pages(
+                metadata['source'],
+                metadata['date'],
+                [doc.metadata.get("regions") or [doc.page_content] for doc in documents]
+            )
+            documents = [
+                Document(page_content="\n\n".join(regions), metadata=dict(doc.metadata, regions=regions))
+                for doc, regions in zip(documents, kept_pages)
+            ]
+
         # Filter out pages with minimal content (mostly images)
         filtered_documents = []
         for i, doc in enumerate(documents):
@@ -287,15 +829,49 @@ class NewspaperExtractor:
 
         # Split filtered documents menjadi chunks
         if filtered_documents:
-            chunks = self.text_splitter.split_documents(filtered_documents)
-            print(f"[INFO] Split into {len(chunks)} chunks")
+            chunks = self.split_documents_by_region(filtered_documents)
+            print(f"[INFO] Split into {len(chunks)} chunks (budget {self.chunk_token_budget} tokens)")
         else:
             chunks = []
 
         return chunks, metadata
 
+    def split_documents_by_region(self, documents: list) -> list:
+        """
+        Kemas region artikel tiap halaman ke chunk sebesar chunk_token_budget
+
+        Region tidak dipotong di tengah kecuali ukurannya sendiri melebihi
+        budget (baru dipecah dengan text_splitter). Chunk tidak melewati batas
+        halaman karena prompt menerima satu nomor halaman per chunk.
+        """
+        chunks = []
+        for doc in documents:
+            metadata = {key: value for key, value in doc.metadata.items() if key not in ("regions", "region_blocks")}
+            regions = doc.metadata.get("regions") or [doc.page_content]
+
+            current = []
+            current_tokens = 0
+            for region in regions:
+                region_tokens = estimate_tokens(region)
+                if current and current_tokens + region_tokens > self.chunk_token_budget:
+                    chunks.append(Document(page_content="\n\n".join(current), metadata=dict(metadata)))
+                    current = []
+                    current_tokens = 0
+
+                if region_tokens > self.chunk_token_budget:
+                    for piece in self.text_splitter.split_text(region):
+                        chunks.append(Document(page_content=piece, metadata=dict(metadata)))
+                    continue
+
+                current.append(region)
+                current_tokens += region_tokens
+
+            if current:
+                chunks.append(Document(page_content="\n\n".join(current), metadata=dict(metadata)))
+        return chunks
+
     def create_extraction_prompt(self) -> ChatPromptTemplate:
-        """Buat prompt template untuk ekstraksi artikel"""
+        """Buat prompt template untuk ekstraksi artikel (dipanggil sekali, lihat self.extraction_prompt)"""
 
         template = """
 
@@ -408,71 +984,369 @@ class NewspaperExtractor:
         {format_instructions}
         """
 
+        if self.prompt_variant == "compact":
+            template = compact_prompt_text(template)
+
         prompt = ChatPromptTemplate.from_template(template)
         return prompt
 
-    def extract_articles_from_chunk(self, chunk_text: str, page_num: int) -> List[NewsArticle]:
-        """Ekstrak artikel dari satu chunk teks"""
+    def _chunk_input(self, chunk_text: str, page_num: int) -> dict:
+        """Input chain ekstraksi untuk satu chunk"""
+        return {
+            "text": chunk_text,
+            "page_num": page_num + 1,  # Page numbering starts from 1
+            "format_instructions": self.format_instructions
+        }
+
+    def _cache_key(self, kind: str, prompt_version: str, inputs: dict) -> Optional[str]:
+        if self.cache is None:
+            return None
+        # format_instructions sudah tercakup di prompt_version
+        inputs = {name: value for name, value in inputs.items() if name != "format_instructions"}
+        return LLMResponseCache.make_key(kind, prompt_version, inputs, self.deployment_name, self.temperature)
+
+    def _cache_get(self, key: Optional[str], model_cls):
+        if key is None:
+            return None
+        return self.cache.get(key, model_cls)
+
+    def _cache_put(self, key: Optional[str], kind: str, result):
+        # Hanya hasil parser yang valid yang disimpan, error tidak di-cache
+        if key is not None and isinstance(result, BaseModel):
+            try:
+                self.cache.put(key, kind, result)
+            except sqlite3.Error as e:
+                print(f"[WARNING] Failed to cache LLM response: {e}")
+
+    @staticmethod
+    def _result_to_articles(result) -> List[NewsArticle]:
+        # Result berupa NewsArticlesList, ambil .articles
+        if isinstance(result, NewsArticlesList):
+            return result.articles
+        elif isinstance(result, list):
+            return result
+        else:
+            return []
+
+    def extract_articles_from_chunk(self, chunk_text: str, page_num: int, usage: TokenUsage = None,
+                                    raise_errors: bool = False) -> List[NewsArticle]:
+        """Ekstrak artikel dari satu chunk teks (error LLM/parser -> [] kecuali raise_errors)"""
 
-        # Setup prompt dan parser
-        prompt = self.create_extraction_prompt()
-        chain = prompt | self.llm | self.parser
+        inputs = self._chunk_input(chunk_text, page_num)
+        key = self._cache_key("chunk", self.prompt_version, inputs)
+        cached = self._cache_get(key, NewsArticlesList)
+        if cached is not None:
+            if usage is not None:
+                usage.add_cached()
+            return cached.articles
 
         try:
             # Jalankan ekstraksi
-            result = chain.invoke({
-                "text": chunk_text,
-                "page_num": page_num + 1,  # Page numbering starts from 1
-                "format_instructions": self.parser.get_format_instructions()
-            })
-
-            # Result berupa NewsArticlesList, ambil .articles
-            if isinstance(result, NewsArticlesList):
-                return result.articles
-            elif isinstance(result, list):
-                return result
-            else:
-                return []
+            result = self.extraction_chain.invoke(inputs, config={"callbacks": [usage] if usage else []})
+            self._cache_put(key, "chunk", result)
+            return self._result_to_articles(result)
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"[WARNING] Error extracting from chunk: {e}")
             return []
 
-    def process_pdf(self, pdf_path: str) -> List[NewsArticle]:
-        """Proses PDF lengkap dan ekstrak semua artikel"""
+    def extract_articles_from_chunks(self, chunk_items: List[tuple], usages: List[TokenUsage] = None,
+                                     on_chunk: Callable[[int, List[NewsArticle]], None] = None,
+                                     failed: set = None) -> List[List[NewsArticle]]:
+        """
+        Ekstrak artikel dari banyak chunk sekaligus dengan chain.batch_as_completed
+
+        Args:
+            chunk_items: list of (chunk_text, page_num)
+            usages: TokenUsage per chunk (boleh None), mis. satu instance per file
+            on_chunk: dipanggil on_chunk(index, articles) begitu satu chunk selesai
+                      (urutan selesai, bukan urutan halaman), di thread pemanggil
+            failed: bila diberikan, index chunk yang gagal (hasilnya []) ditambahkan ke set ini
+
+        Returns:
+            List hasil per chunk, urutannya sama dengan chunk_items
+        """
+        usages = usages or [None] * len(chunk_items)
+        inputs = [self._chunk_input(text, page_num) for text, page_num in chunk_items]
+        keys = [self._cache_key("chunk", self.prompt_version, item) for item in inputs]
+        results = [self._cache_get(key, NewsArticlesList) for key in keys]
+
+        # Hanya chunk yang belum ada di cache yang dikirim ke LLM
+        missing = [i for i, result in enumerate(results) if result is None]
+        if len(missing) < len(results):
+            print(f"[INFO] {len(results) - len(missing)}/{len(results)} chunks served from LLM cache")
+            for i, result in enumerate(results):
+                if result is not None and usages[i] is not None:
+                    usages[i].add_cached()
+        chunk_articles = [None] * len(chunk_items)
+
+        def finish(i, result):
+            if isinstance(result, Exception):
+                print(f"[WARNING] Error extracting from chunk (page {chunk_items[i][1] + 1}): {result}")
+                chunk_articles[i] = []
+                if failed is not None:
+                    failed.add(i)
+            else:
+                chunk_articles[i] = self._result_to_articles(result)
+            if on_chunk is not None:
+                on_chunk(i, chunk_articles[i])
+
+        for i, result in enumerate(results):
+            if result is not None:
+                finish(i, result)
+
+        if missing:
+            # batch_as_completed() mengembalikan (posisi, hasil) begitu request selesai;
+            # max_concurrency membatasi request yang berjalan bersamaan
+            for j, result in self.extraction_chain.batch_as_completed(
+                [inputs[i] for i in missing],
+                config=[
+                    {"max_concurrency": self.max_concurrency, "callbacks": [usages[i]] if usages[i] else []}
+                    for i in missing
+                ],
+                return_exceptions=True
+            ):
+                i = missing[j]
+                self._cache_put(keys[i], "chunk", result)
+                finish(i, result)
+
+        return chunk_articles
+
+    def process_pdf(self, pdf_path: str, usage: TokenUsage = None,
+                    on_chunk: Callable[[int, int, List[NewsArticle], int, int], None] = None,
+                    reuse_stored: bool = True) -> List[NewsArticle]:
+        """
+        Proses PDF lengkap dan ekstrak semua artikel (token dihitung ke usage bila diberikan)
+
+        on_chunk dan reuse_stored sama seperti di process_pdfs (file_index selalu 0).
+        """
 
         print(f"[INFO] Starting extraction from: {pdf_path}")
 
+        file_hash = file_sha256(pdf_path) if self.article_store is not None else None
+        stored = self._stored_edition(file_hash, self.extract_metadata_from_filename(pdf_path)) if reuse_stored else None
+        if stored is not None:
+            return stored
+
         # Load dan split PDF
         chunks, metadata = self.load_and_split_pdf(pdf_path)
 
-        all_articles = []
-        chunk_count = 0
+        chunk_items = self._chunk_items(chunks)
+        failed = set()
+        chunk_results = self._extract_chunk_items(
+            chunk_items, [usage] * len(chunk_items),
+            on_chunk=self._file_chunk_callback(on_chunk, [(metadata, 0, chunk_items)]),
+            failed=failed
+        )
+        articles = self._assemble_articles(chunk_items, chunk_results, metadata)
+        self._save_edition(file_hash, metadata, articles, complete=not failed)
+        return articles
+
+    def process_pdfs(self, pdf_paths: List[str], load_workers: int = None,
+                     usages: List[TokenUsage] = None,
+                     on_chunk: Callable[[int, int, List[NewsArticle], int, int], None] = None,
+                     reuse_stored: bool = True) -> List[List[NewsArticle]]:
+        """
+        Proses banyak PDF sekaligus (mis. koran harian satu bulan)
 
-        # Process setiap chunk
-        for i, chunk in enumerate(chunks):
-            chunk_count += 1
-            page_num = getattr(chunk, 'metadata', {}).get('page', i)
+        Teks PDF diekstrak paralel di process pool, lalu chunk dari semua file
+        masuk ke satu antrian LLM (chain.batch dengan max_concurrency), jadi
+        request tidak menunggu per file. Hasil per file sama dengan process_pdf.
+        Jika usages diberikan (satu TokenUsage per file), token dihitung per file.
 
-            print(f"[INFO] Processing chunk {chunk_count}/{len(chunks)} (page {page_num + 1})")
+        on_chunk(file_index, page_num, articles, done, total) dipanggil setiap kali
+        satu chunk selesai, dengan artikel mentah chunk itu (sumber sudah diisi,
+        belum di-merge), jadi UI bisa menampilkan hasil sebagian sebelum semua
+        file selesai dan tetap punya hasil itu bila file berikutnya gagal.
 
-            # Ekstrak artikel dari chunk ini
-            articles = self.extract_articles_from_chunk(
-                chunk.page_content,
-                page_num
-            )
+        Dengan article_store, file yang persis sama (SHA-256 isi file) dan sudah
+        pernah diekstrak lengkap dimuat dari pdf_articles tanpa load PDF maupun LLM
+        (reuse_stored=False memaksa ekstraksi ulang). Hasil ekstraksi baru disimpan
+        per file, menggantikan hasil lama, hanya bila file termuat dan tidak ada
+        chunk yang gagal.
+
+        Returns:
+            List artikel per file, urutannya sama dengan pdf_paths
+        """
+        pdf_paths = list(pdf_paths)
+        if not pdf_paths:
+            return []
+        usages = usages or [None] * len(pdf_paths)
+
+        # File yang sudah pernah diekstrak lengkap tidak perlu di-load maupun dikirim ke LLM
+        all_metadata = [self.extract_metadata_from_filename(path) for path in pdf_paths]
+        file_hashes = [file_sha256(path) if self.article_store is not None else None for path in pdf_paths]
+        stored = [
+            self._stored_edition(file_hash, metadata) if reuse_stored else None
+            for file_hash, metadata in zip(file_hashes, all_metadata)
+        ]
+        load_paths = [path for path, articles in zip(pdf_paths, stored) if articles is None]
+
+        load_workers = max(1, int(load_workers or DEFAULT_LOAD_WORKERS))
+        print(f"[INFO] Loading {len(load_paths)} PDFs ({min(load_workers, max(1, len(load_paths)))} worker processes), "
+              f"{len(pdf_paths) - len(load_paths)} editions from pdf_articles")
+
+        loaded = []
+        if len(load_paths) > 1 and load_workers > 1:
+            with ProcessPoolExecutor(max_workers=min(load_workers, len(load_paths))) as pool:
+                futures = [pool.submit(load_pdf_documents, path) for path in load_paths]
+                for path, future in zip(load_paths, futures):
+                    try:
+                        loaded.append(future.result())
+                    except Exception as e:
+                        print(f"[ERROR] Failed to load {path}: {e}")
+                        loaded.append([])
+        else:
+            for path in load_paths:
+                try:
+                    loaded.append(load_pdf_documents(path))
+                except Exception as e:
+                    print(f"[ERROR] Failed to load {path}: {e}")
+                    loaded.append([])
+        loaded = iter(loaded)
+
+        # Semua chunk dari semua file dalam satu antrian, dicatat rentangnya per file
+        files = []
+        all_items = []
+        item_usages = []
+        load_failed = set()
+        for file_index, (path, metadata, articles, usage) in enumerate(zip(pdf_paths, all_metadata, stored, usages)):
+            if articles is not None:
+                files.append((metadata, len(all_items), []))
+                continue
+            documents = next(loaded)
+            if not documents:
+                load_failed.add(file_index)
+            chunks, metadata = self.load_and_split_pdf(path, documents=documents)
+            chunk_items = self._chunk_items(chunks)
+            files.append((metadata, len(all_items), chunk_items))
+            all_items.extend(chunk_items)
+            item_usages.extend([usage] * len(chunk_items))
+
+        failed = set()
+        all_results = self._extract_chunk_items(all_items, item_usages,
+                                                on_chunk=self._file_chunk_callback(on_chunk, files),
+                                                failed=failed)
+
+        results = []
+        for file_index, ((metadata, start, chunk_items), articles) in enumerate(zip(files, stored)):
+            if articles is None:
+                articles = self._assemble_articles(chunk_items, all_results[start:start + len(chunk_items)], metadata)
+                complete = file_index not in load_failed and not any(
+                    i in failed for i in range(start, start + len(chunk_items))
+                )
+                self._save_edition(file_hashes[file_index], metadata, articles, complete)
+            results.append(articles)
+        return results
+
+    def _stored_edition(self, file_hash: Optional[str], metadata: dict) -> Optional[List[NewsArticle]]:
+        """Artikel file ini dari article_store, atau None bila belum pernah diekstrak lengkap"""
+        if self.article_store is None or file_hash is None:
+            return None
+        articles = self.article_store.load_edition(file_hash)
+        if articles is not None:
+            print(f"[INFO] {metadata['filename']}: file already extracted, "
+                  f"{len(articles)} articles loaded from pdf_articles")
+        return articles
+
+    def _save_edition(self, file_hash: Optional[str], metadata: dict, articles: List[NewsArticle], complete: bool):
+        """Simpan hasil ekstraksi satu file ke article_store, hanya bila lengkap"""
+        if self.article_store is None or file_hash is None:
+            return
+        if not complete:
+            print(f"[WARNING] {metadata['filename']}: some chunks failed, results not saved to pdf_articles")
+            return
+        edition_date = datetime.fromisoformat(metadata['date']).date() if metadata['date'] else None
+        self.article_store.save_edition(file_hash, metadata['source'], edition_date, articles)
+
+    @staticmethod
+    def _chunk_items(chunks) -> List[tuple]:
+        """(chunk_text, page_num) untuk setiap chunk"""
+        return [
+            (chunk.page_content, getattr(chunk, 'metadata', {}).get('page', i))
+            for i, chunk in enumerate(chunks)
+        ]
+
+    @staticmethod
+    def _file_chunk_callback(on_chunk, files):
+        """
+        Ubah callback per chunk global (index, articles) menjadi
+        on_chunk(file_index, page_num, articles, done, total)
+        """
+        if on_chunk is None:
+            return None
+        owners = []
+        for file_index, (metadata, _, chunk_items) in enumerate(files):
+            owners.extend((file_index, metadata, page_num) for _, page_num in chunk_items)
+        done = [0]
+
+        def callback(i, articles):
+            file_index, metadata, page_num = owners[i]
+            for article in articles:
+                article.sumber = metadata['source']
+            done[0] += 1
+            on_chunk(file_index, page_num, articles, done[0], len(owners))
+        return callback
 
+    def _extract_chunk_items(self, chunk_items: List[tuple], usages: List[TokenUsage] = None,
+                             on_chunk: Callable[[int, List[NewsArticle]], None] = None,
+                             failed: set = None) -> List[List[NewsArticle]]:
+        """
+        Ekstrak semua chunk, paralel bila max_concurrency > 1; hasil dalam urutan chunk_items
+
+        Index chunk yang gagal ditambahkan ke ``failed`` (bila diberikan).
+        """
+        usages = usages or [None] * len(chunk_items)
+        if self.max_concurrency > 1 and len(chunk_items) > 1:
+            # Semua chunk dikirim paralel, hasil tetap dalam urutan halaman
+            print(f"[INFO] Processing {len(chunk_items)} chunks (max {self.max_concurrency} concurrent requests)")
+            return self.extract_articles_from_chunks(chunk_items, usages, on_chunk=on_chunk, failed=failed)
+
+        chunk_results = []
+        for chunk_count, ((chunk_text, page_num), usage) in enumerate(zip(chunk_items, usages), 1):
+            print(f"[INFO] Processing chunk {chunk_count}/{len(chunk_items)} (page {page_num + 1})")
+            try:
+                chunk_results.append(self.extract_articles_from_chunk(chunk_text, page_num, usage, raise_errors=True))
+            except Exception as e:
+                print(f"[WARNING] Error extracting from chunk (page {page_num + 1}): {e}")
+                chunk_results.append([])
+                if failed is not None:
+                    failed.add(chunk_count - 1)
+            if on_chunk is not None:
+                on_chunk(chunk_count - 1, chunk_results[-1])
+        return chunk_results
+
+    def _assemble_articles(self, chunk_items: List[tuple], chunk_results: List[List[NewsArticle]],
+                           metadata: dict) -> List[NewsArticle]:
+        """Set sumber, gabungkan hasil chunk satu file dan merge artikel bersambung"""
+        all_articles = []
+        for (_, page_num), articles in zip(chunk_items, chunk_results):
             # Set sumber untuk semua artikel
             for article in articles:
                 article.sumber = metadata['source']
 
             all_articles.extend(articles)
-            print(f"[INFO] Found {len(articles)} articles in this chunk")
+            print(f"[INFO] Found {len(articles)} articles in chunk (page {page_num + 1})")
 
         # Gabungkan artikel yang bersambung sebelum mengembalikan
         merged_articles = self.merge_continued_articles(all_articles)
 
-        print(f"[SUCCESS] Extraction completed: {len(all_articles)} raw articles, {len(merged_articles)} final articles")
+        # Artikel yang cocok dengan news_articles sudah lengkap, tidak ikut proses merge
+        for match in metadata.get('web_matches', []):
+            merged_articles.append(LinkedNewsArticle(
+                judul=match['title'],
+                konten=match['contents'],
+                kategori=bps_utils.classify_text(f"{match['title']} {match['contents']}".lower()),
+                halaman=match['page'] + 1,
+                sumber=metadata['source'],
+                web_article_id=match['id'],
+                links=match['links'] or ""
+            ))
+
+        print(f"[SUCCESS] Extraction completed: {len(all_articles)} raw articles, {len(merged_articles)} final articles "
+              f"({len(metadata.get('web_matches', []))} from web cross-check)")
         return merged_articles
 
     def merge_continued_articles(self, articles: List[NewsArticle]) -> List[NewsArticle]:
@@ -724,14 +1598,22 @@ class NewspaperExtractor:
         # Create chain
         chain = prompt | self.llm | parser
 
+        inputs = {
+            "filename": filename,
+            "total_articles": len(articles),
+            "articles_text": articles_text,
+            "format_instructions": parser.get_format_instructions()
+        }
+        prompt_version = hashlib.sha256(prompt.pretty_repr().encode("utf-8")).hexdigest()
+        key = self._cache_key("description", prompt_version, inputs)
+        cached = self._cache_get(key, FileDescription)
+        if cached is not None:
+            return cached
+
         try:
             # Invoke AI
-            result = chain.invoke({
-                "filename": filename,
-                "total_articles": len(articles),
-                "articles_text": articles_text,
-                "format_instructions": parser.get_format_instructions()
-            })
+            result = chain.invoke(inputs)
+            self._cache_put(key, "description", result)
 
             return result
 
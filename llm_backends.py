@@ -0,0 +1,127 @@
+"""
+LLM backends untuk NewspaperExtractor.
+
+create_chat_model() mengembalikan chat model LangChain sesuai LLM_BACKEND:
+"azure" (AzureChatOpenAI) atau "ollama" (server Ollama sendiri lewat
+/api/chat). Keduanya dipakai dengan chain yang sama, jadi batch() dengan
+max_concurrency, cache respons dan TokenUsage tetap berlaku.
+"""
+import os
+import threading
+from typing import Any, List, Optional
+
+import requests
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "azure")
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/chat")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen3:4b-instruct")
+OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT", "300"))
+
+# Tipe pesan LangChain -> role di API Ollama
+_ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+
+class OllamaChatModel(BaseChatModel):
+    """
+    Chat model untuk endpoint /api/chat Ollama.
+
+    Setiap thread memakai satu requests.Session (keep-alive), sehingga
+    request paralel dari chain.batch tidak membuka koneksi baru per chunk.
+    Prompt yang melebihi token_limit ditolak sebelum dikirim; num_ctx di
+    server diset ke token_limit yang sama.
+    """
+
+    url: str = OLLAMA_URL
+    model: str = OLLAMA_MODEL
+    temperature: float = 0.1
+    token_limit: int = 16000
+    chars_per_token: int = 4
+    timeout: int = OLLAMA_TIMEOUT
+
+    _local: Any = PrivateAttr(default_factory=threading.local)
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama-chat"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"url": self.url, "model": self.model, "temperature": self.temperature}
+
+    def _session(self):
+        # requests.Session is not guaranteed thread-safe, keep one per thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        payload_messages = [
+            {"role": _ROLES.get(message.type, "user"), "content": message.content}
+            for message in messages
+        ]
+
+        estimated_tokens = sum(len(m["content"]) for m in payload_messages) // self.chars_per_token + 1
+        if estimated_tokens > self.token_limit:
+            raise ValueError(
+                f"Prompt ~{estimated_tokens} tokens exceeds OLLAMA_TOKEN_LIMIT {self.token_limit}"
+            )
+
+        options = {"temperature": self.temperature, "num_ctx": self.token_limit}
+        if stop:
+            options["stop"] = stop
+
+        resp = self._session().post(
+            self.url,
+            json={"model": self.model, "messages": payload_messages, "stream": False, "options": options},
+            timeout=self.timeout
+        )
+        resp.raise_for_status()
+        data = resp.json()
+
+        # Format token_usage sama dengan OpenAI agar TokenUsage bisa membacanya
+        usage = {
+            "prompt_tokens": data.get("prompt_eval_count", 0),
+            "completion_tokens": data.get("eval_count", 0),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        message = AIMessage(content=(data.get("message") or {}).get("content", ""))
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"token_usage": usage, "model_name": self.model}
+        )
+
+
+def create_chat_model(backend: str = None, temperature: float = 0.1, token_limit: int = 16000,
+                      azure_endpoint: str = None, azure_key: str = None, api_version: str = None,
+                      deployment_name: str = None, ollama_url: str = None, ollama_model: str = None):
+    """Buat chat model LangChain untuk backend "azure" atau "ollama"."""
+    backend = (backend or LLM_BACKEND).lower()
+
+    if backend == "ollama":
+        return OllamaChatModel(
+            url=ollama_url or OLLAMA_URL,
+            model=ollama_model or OLLAMA_MODEL,
+            temperature=temperature,
+            token_limit=token_limit
+        )
+
+    if backend == "azure":
+        from langchain_openai import AzureChatOpenAI
+        return AzureChatOpenAI(
+            azure_endpoint=azure_endpoint,
+            api_key=azure_key,
+            api_version=api_version,
+            deployment_name=deployment_name,
+            temperature=temperature,
+            max_tokens=None
+        )
+
+    raise ValueError(f"Unknown LLM backend: {backend} (expected 'azure' or 'ollama')")
@@ -0,0 +1,308 @@
+"""
+Columnar Parquet copy of news_articles for analytics.
+
+Run it nightly, e.g. from cron:
+
+    0 2 * * * cd /opt/news_bps_scraper && python parquet_archive.py
+
+Layout is one file per month with hive-style partition folders:
+
+    parquet_archive/month=2025-01/articles.parquet
+
+Files are zstd compressed; sources, kategori_bps and bps_category (the
+dashboard's keyword classification, computed at export time) use Parquet
+dictionary encoding. Exports are incremental: a normal run reads the row
+count and MAX(id) per month from the date index only and rewrites the
+months where either differs from the previous run (kept in
+<root>/_state.json), so new and deleted articles are picked up without
+touching contents. Every RECONCILE_DAYS, and with --full, the fingerprint
+also gets a BIT_XOR of CRC32 over the exported columns, which catches
+edited contents or kategori_bps and a delete plus an insert in one month.
+
+With ANALYTICS_BACKEND = duckdb the dashboards run the search summary and
+chart aggregations over these files with DuckDB instead of MySQL.
+"""
+import os
+import json
+import shutil
+import hashlib
+import argparse
+import configparser
+from datetime import date, datetime, timedelta
+
+import pymysql
+
+import bps_utils
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+ARCHIVE_DIR = "parquet_archive"
+STATE_NAME = "_state.json"
+FILE_NAME = "articles.parquet"
+CHUNK_SIZE = 5000
+RECONCILE_DAYS = 7  # full checksum pass over news_articles (in-place edits of old rows)
+
+COLUMNS = ["id", "date", "title", "contents", "reporter", "sources", "links",
+           "kategori_bps", "kategori_bps_detail"]
+DICTIONARY_COLUMNS = ["sources", "kategori_bps", "bps_category"]
+
+
+def _schema():
+    fields = [pa.field(name, pa.string()) for name in COLUMNS + ["bps_category"]]
+    fields[0] = pa.field("id", pa.int64())
+    fields[1] = pa.field("date", pa.date32())
+    return pa.schema(fields)
+
+
+def _month_bounds(month):
+    year, mon = (int(part) for part in month.split("-"))
+    first = date(year, mon, 1)
+    after = date(year + 1, 1, 1) if mon == 12 else date(year, mon + 1, 1)
+    return first, after
+
+
+def load_state(root):
+    path = os.path.join(root, STATE_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(root, state):
+    tmp_path = os.path.join(root, STATE_NAME + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, os.path.join(root, STATE_NAME))
+
+
+def archive_watermark(root):
+    """Changes every time an export run rewrote something (for result caches)."""
+    state = load_state(root)
+    return state.get("exported_at"), state.get("watermark")
+
+
+def month_fingerprints(conn, checksum=False, month=None):
+    """
+    {month: [row count, MAX(id)]} of news_articles, answered from
+    idx_news_articles_date alone.
+
+    With ``checksum`` a BIT_XOR of CRC32 over the exported columns is
+    appended; that reads every row including contents, so it only runs for
+    the months being exported and on the periodic reconcile. ``month``
+    limits the query to one month.
+    """
+    select = "DATE_FORMAT(date, '%%Y-%%m') AS month, COUNT(*), MAX(id)"
+    if checksum:
+        # Columns are separated by a marker that cannot appear in text so NULL and '' differ
+        checksum_expr = "CONCAT_WS(CHAR(31), " + ", ".join(f"IFNULL({name}, CHAR(30))" for name in COLUMNS) + ")"
+        select += f", BIT_XOR(CRC32({checksum_expr}))"
+    where, params = "date IS NOT NULL", []
+    if month is not None:
+        where += " AND date >= %s AND date < %s"
+        params.extend(_month_bounds(month))
+    cursor = conn.cursor(pymysql.cursors.Cursor)
+    try:
+        cursor.execute(f"SELECT {select} FROM news_articles WHERE {where} GROUP BY month", params)
+        return {
+            row[0]: [int(row[1]), int(row[2])] + [str(value) for value in row[3:]]
+            for row in cursor.fetchall()
+        }
+    finally:
+        cursor.close()
+
+
+def changed_months(conn, previous=None, checksum=False):
+    """
+    Months whose fingerprint differs from ``previous`` (all months if None),
+    all months that still have articles, and the new fingerprints. Without
+    ``checksum`` only row count and MAX(id) are compared.
+    """
+    fingerprints = month_fingerprints(conn, checksum)
+    if previous is None:
+        months = sorted(fingerprints)
+    else:
+        width = 3 if checksum else 2
+        months = sorted(month for month, value in fingerprints.items() if (previous.get(month) or [])[:width] != value)
+    return months, set(fingerprints), fingerprints
+
+
+def export_month(conn, root, month):
+    """Rewrite one month partition from MySQL; returns the number of rows written."""
+    first, after = _month_bounds(month)
+    folder = os.path.join(root, f"month={month}")
+    os.makedirs(folder, exist_ok=True)
+    final_path = os.path.join(folder, FILE_NAME)
+    tmp_path = final_path + ".tmp"
+    schema = _schema()
+
+    written = 0
+    writer = pq.ParquetWriter(tmp_path, schema, compression="zstd", use_dictionary=DICTIONARY_COLUMNS)
+    cursor = conn.cursor(pymysql.cursors.SSCursor)
+    try:
+        cursor.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM news_articles WHERE date >= %s AND date < %s ORDER BY date, id",
+            (first, after)
+        )
+        while True:
+            rows = cursor.fetchmany(CHUNK_SIZE)
+            if not rows:
+                break
+            rows = [row + (bps_utils.classify_text(f"{row[2] or ''} {row[3] or ''}".lower()),) for row in rows]
+            data = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(data, schema)], schema=schema
+            ))
+            written += len(rows)
+    finally:
+        cursor.close()
+        writer.close()
+
+    if written:
+        os.replace(tmp_path, final_path)
+    else:
+        os.remove(tmp_path)
+        shutil.rmtree(folder, ignore_errors=True)
+    return written
+
+
+def run(db_config, root=ARCHIVE_DIR, full=False):
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Parquet archive needs pyarrow: pip install pyarrow")
+    os.makedirs(root, exist_ok=True)
+    state = load_state(root)
+    # A changed keyword rule changes bps_category everywhere
+    if full or state.get("rules_version") != bps_utils.RULES_VERSION:
+        previous = None
+    else:
+        previous = state.get("months")
+    reconciled_at = state.get("reconciled_at")
+    reconcile = (
+        previous is None
+        or not reconciled_at
+        or datetime.now() - datetime.fromisoformat(reconciled_at) >= timedelta(days=RECONCILE_DAYS)
+    )
+
+    conn = pymysql.connect(**db_config)
+    try:
+        months, all_months, fingerprints = changed_months(conn, previous, checksum=reconcile)
+        if previous is None:
+            mode = " (full export)"
+        elif reconcile:
+            mode = " (changed since last run, full checksum)"
+        else:
+            mode = " (new or deleted rows since last run)"
+        print(f"🗄️ {len(months)} month(s) to export" + mode)
+        for month in months:
+            if not reconcile:
+                # Checksum taken before the export, a later edit still shows up at the next reconcile
+                fingerprints.update(month_fingerprints(conn, checksum=True, month=month))
+            rows = export_month(conn, root, month)
+            print(f"  ✅ month={month}: {rows} articles")
+    finally:
+        conn.close()
+
+    if not reconcile:
+        # Unchanged months keep the checksum of their last export
+        for month in all_months.difference(months):
+            fingerprints[month] = previous[month]
+
+    # Months that no longer have any article
+    for name in os.listdir(root):
+        if name.startswith("month=") and name[len("month="):] not in all_months:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+            print(f"  🗑️ removed {name}")
+
+    state.update({
+        "months": fingerprints,
+        "watermark": hashlib.sha1(json.dumps(fingerprints, sort_keys=True).encode("utf-8")).hexdigest()[:16],
+        "rules_version": bps_utils.RULES_VERSION,
+        "exported_at": datetime.now().isoformat(timespec="seconds"),
+    })
+    if reconcile:
+        state["reconciled_at"] = state["exported_at"]
+    _save_state(root, state)
+
+
+# === DuckDB query path ===
+def _duckdb_source(root):
+    pattern = os.path.join(root, "month=*", FILE_NAME).replace("'", "''")
+    return f"read_parquet('{pattern}', hive_partitioning = true)"
+
+
+def _duckdb_filters(start_date, end_date, keywords):
+    where, params = ["1=1"], []
+    if start_date:
+        where.append("date >= ?")
+        params.append(start_date)
+    if end_date:
+        where.append("date <= ?")
+        params.append(end_date)
+    if keywords:
+        where.append("(" + " OR ".join("(title ILIKE ? OR contents ILIKE ?)" for _ in keywords) + ")")
+        for keyword in keywords:
+            params.extend([f"%{keyword}%", f"%{keyword}%"])
+    return " AND ".join(where), params
+
+
+def duckdb_search_summary(root, start_date, end_date, keywords):
+    """Same result as db_utils.search_summary, computed over the Parquet files."""
+    where, params = _duckdb_filters(start_date, end_date, keywords)
+    with duckdb.connect() as con:
+        total, min_date, max_date, source_count = con.execute(f"""
+            SELECT COUNT(*), MIN(date), MAX(date), COUNT(DISTINCT NULLIF(sources, ''))
+            FROM {_duckdb_source(root)} WHERE {where}
+        """, params).fetchone()
+    return {"total": total, "min_date": min_date, "max_date": max_date, "source_count": source_count}
+
+
+def duckdb_search_aggregates(root, start_date, end_date, keywords):
+    """Same result as db_utils.search_aggregates, computed over the Parquet files."""
+    where, params = _duckdb_filters(start_date, end_date, keywords)
+    source = _duckdb_source(root)
+    with duckdb.connect() as con:
+        by_source = con.execute(f"""
+            SELECT sources, COUNT(*) AS cnt FROM {source}
+            WHERE {where} AND sources IS NOT NULL GROUP BY sources ORDER BY cnt DESC
+        """, params).fetchall()
+        by_bps = con.execute(f"""
+            SELECT bps_category, COUNT(*) AS cnt FROM {source}
+            WHERE {where} GROUP BY bps_category ORDER BY cnt DESC
+        """, params).fetchall()
+        by_day = con.execute(f"""
+            SELECT date, COUNT(*) FROM {source}
+            WHERE {where} AND date IS NOT NULL GROUP BY date ORDER BY date
+        """, params).fetchall()
+    return {"sources": by_source, "bps": by_bps, "days": by_day}
+
+
+def _db_config_from_ini(path="config.ini"):
+    config = configparser.ConfigParser()
+    config.read(path)
+    return {
+        "host": os.getenv("DB_HOST", config.get("DEFAULT", "DB_HOST", fallback="localhost")),
+        "user": os.getenv("DB_USER", config.get("DEFAULT", "DB_USER", fallback="root")),
+        "password": os.getenv("DB_PASSWORD", config.get("DEFAULT", "DB_PASSWORD", fallback="")),
+        "database": os.getenv("DB_NAME", config.get("DEFAULT", "DB_NAME", fallback="news_database")),
+        "charset": "utf8mb4",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export news_articles to a monthly Parquet archive")
+    parser.add_argument("--out", default=ARCHIVE_DIR, help=f"archive directory (default: {ARCHIVE_DIR})")
+    parser.add_argument("--full", action="store_true", help="rewrite every month instead of only changed ones (also resets the checksum reconcile)")
+    parser.add_argument("--config", default="config.ini", help="config file with DB_* settings")
+    args = parser.parse_args()
+    run(_db_config_from_ini(args.config), args.out, full=args.full)
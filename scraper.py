@@ -1,11 +1,16 @@
 import subprocess
 import sys
+import argparse
 import csv, os, time
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
 import pymysql
 import subprocess
 
+import fetch_utils
+import crawl_state
+import db_utils
+
 # Scrapers
 from scraper_gopost import fetch_articles as fetch_gopost
 from scraper_gopos import fetch_articles as fetch_gopos
@@ -23,6 +28,18 @@ CATEGORY_FILE = "category.txt"
 RUNTIME_FILE = "runtime.txt"
 SKIP_RUNTIME = True  # True = skip waiting for runtime.txt, False = use schedule
 
+# Download/parse pipeline (see fetch_utils.py)
+DOWNLOAD_WORKERS = 4                 # concurrent article downloads per list page
+PARSE_WORKERS = os.cpu_count() or 1  # processes running the HTML extractors
+ARCHIVE_DIR = "archive"              # raw HTML archive of every fetched page
+REPLAY = False                       # --replay: re-extract from ARCHIVE_DIR, no network
+VALIDATOR_DB = "http_cache.sqlite"   # ETag/Last-Modified per list page URL
+CONDITIONAL_GET = True               # --full-refresh: ignore stored validators for the first cycle
+STATE_FILE = "crawl_state.json"      # per-category checkpoint (category, page, last link)
+RESUME = False                       # --resume: continue an interrupted cycle from STATE_FILE
+ROLLUP_RECONCILE_HOURS = 24          # full daily_source_stats rebuild interval (clean_dup may touch any day)
+_last_rollup_reconcile = None
+
 # Date range
 # END_DATE = datetime.strptime("2025-12-31", "%Y-%m-%d").date()
 # START_DATE = datetime.strptime("2024-01-01", "%Y-%m-%d").date()
@@ -86,6 +103,15 @@ def ensure_database_and_table(db_config):
         else:
             print(f"⚠️ Could not add BPS columns: {e}")
 
+    # Per-day, per-source counts for the dashboard overview
+    db_utils.ensure_rollup_table(cursor)
+    # (date, id) order for the dashboard's paged article search
+    db_utils.ensure_search_index(cursor)
+    # Articles extracted from PDF editions by the dashboard
+    db_utils.ensure_pdf_articles_table(cursor)
+    # Stored rule-based BPS code for the dashboard charts
+    db_utils.ensure_bps_category_columns(cursor)
+
     cursor.close()
     conn.close()
 
@@ -126,6 +152,7 @@ def read_runtime_file():
 
 
 def run_scraper_cycle():
+    global _last_rollup_reconcile, RESUME, CONDITIONAL_GET
     print(f"🚀 Starting multi-source news scraper at {datetime.now().strftime('%Y-%m-%d %I:%M%p')}")
     ensure_database_and_table(db_config)
 
@@ -135,8 +162,25 @@ def run_scraper_cycle():
         return
 
     article_id_counters = {}
+    fetch_utils.configure(
+        download_workers=DOWNLOAD_WORKERS,
+        parse_workers=PARSE_WORKERS,
+        archive_dir=ARCHIVE_DIR,
+        replay=REPLAY,
+        validator_db=VALIDATOR_DB,
+        conditional=CONDITIONAL_GET
+    )
+    if REPLAY:
+        print(f"📼 Replay mode: reading pages from {ARCHIVE_DIR}, no network requests")
+    crawl_state.configure(STATE_FILE, resume=RESUME)
+    # --resume / --full-refresh only apply to the first cycle, later scheduled runs start fresh
+    RESUME = False
+    CONDITIONAL_GET = True
 
     for url in category_urls:
+        if crawl_state.is_done(url):
+            print(f"\n⏭️ Already completed before interruption, skipping: {url}")
+            continue
         print(f"\n📂 Processing category: {url}")
         domain = urlparse(url).netloc.lower()
         clean_name = clean_domain(domain)
@@ -167,7 +211,10 @@ def run_scraper_cycle():
             continue
 
         article_id_counters[clean_name] = last_id
+        crawl_state.category_done(url)
 
+    crawl_state.finish()
+    fetch_utils.shutdown()
     print("✅ Scraping cycle completed.")
 
     # --- Run other Python scripts sequentially ---
@@ -179,11 +226,69 @@ def run_scraper_cycle():
     except subprocess.CalledProcessError as e:
         print(f"❌ Error running classifier scripts: {e}")
 
+    # --- Refresh dashboard rollup for the days this cycle touched ---
+    # clean_dup.py can delete duplicates from any day, so older days are
+    # recounted with a full rebuild on the first cycle and then periodically
+    full = (_last_rollup_reconcile is None
+            or datetime.now() - _last_rollup_reconcile >= timedelta(hours=ROLLUP_RECONCILE_HOURS))
+    try:
+        conn = pymysql.connect(**db_config)
+        try:
+            changed = db_utils.refresh_daily_source_stats(conn, since=None if full else START_DATE)
+            if full:
+                _last_rollup_reconcile = datetime.now()
+                print(f"📊 daily_source_stats rebuilt for all days ({changed} rows changed)")
+            else:
+                print(f"📊 daily_source_stats refreshed since {START_DATE} ({changed} rows changed)")
+        finally:
+            conn.close()
+    except pymysql.err.Error as e:
+        print(f"⚠️ Could not refresh daily_source_stats: {e}")
+
+    # --- Classify new articles (or all of them after a BPS rule change) ---
+    try:
+        conn = pymysql.connect(**db_config)
+        try:
+            classified = db_utils.refresh_bps_categories(conn)
+            print(f"🏷️ bps_category stored for {classified} articles")
+        finally:
+            conn.close()
+    except pymysql.err.Error as e:
+        print(f"⚠️ Could not refresh bps_category: {e}")
+
 
 # === SERVICE LOOP ===
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-source news scraper")
+    parser.add_argument("--replay", action="store_true",
+                        help="re-extract articles from the raw HTML archive instead of the live sites")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR,
+                        help=f"raw HTML archive directory (default: {ARCHIVE_DIR})")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="re-download list pages even if unchanged (e.g. after widening the date range)")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"continue an interrupted cycle from the checkpoints in {STATE_FILE}")
+    parser.add_argument("--start-date", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(),
+                        help="first article date to scrape, YYYY-MM-DD (default: 5 days ago)")
+    parser.add_argument("--end-date", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(),
+                        help="last article date to scrape, YYYY-MM-DD (default: today)")
+    args = parser.parse_args()
+    if args.start_date:
+        START_DATE = args.start_date
+    if args.end_date:
+        END_DATE = args.end_date
+    ARCHIVE_DIR = args.archive_dir
+    REPLAY = args.replay
+    RESUME = args.resume
+    # A resumed page may already have its validators stored, a 304 there would end the category early
+    CONDITIONAL_GET = not (args.full_refresh or args.resume)
+
     print("🛎️ News scraper service started.")
 
+    if REPLAY:
+        run_scraper_cycle()
+        exit(0)
+
     if SKIP_RUNTIME:
         print("⚡ SKIP_RUNTIME is True. Running scraper immediately without schedule.")
         run_scraper_cycle()
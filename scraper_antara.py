@@ -5,6 +5,10 @@ import re
 import time
 import pymysql  # <-- ganti driver
 
+import fetch_utils
+import db_utils
+import crawl_state
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
 }
@@ -14,9 +18,13 @@ MAX_PAGES = 1000
 # ----------------------
 # UTILS
 # ----------------------
-def get_soup(url):
+def get_soup(url, conditional=False):
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = fetch_utils.get(url, headers=HEADERS, timeout=10, conditional=conditional)
+        if response.status_code == 304:
+            # List page unchanged since last cycle, nothing new further down either
+            print(f"⏭️ Not modified (304), stopping pagination: {url}")
+            return None
         response.raise_for_status()
         return BeautifulSoup(response.text, "html.parser")
     except requests.HTTPError as e:
@@ -63,6 +71,12 @@ def save_article_mysql(article, db_config):
     conn = pymysql.connect(**db_config)
     cursor = conn.cursor()
     try:
+        # Replay: re-parsed article overwrites the stored row
+        if fetch_utils.REPLAY and db_utils.update_replayed_article(cursor, article):
+            conn.commit()
+            print(f"Updated   : {article['title']} ({article['date']})")
+            return False
+
         # Check for existing article
         cursor.execute(
             "SELECT id FROM news_articles WHERE title=%s OR links=%s",
@@ -110,11 +124,11 @@ def fetch_articles(category_url, start_date, end_date, db_config, start_id=1):
     """
     id_counter = start_id
 
-    for page in range(1, MAX_PAGES + 1):
+    for page in range(crawl_state.start_page(category_url), MAX_PAGES + 1):
         # Correct pagination: page 1 = base URL, page 2+ = /2, /3, ...
         url = category_url if page == 1 else f"{category_url.rstrip('/')}/{page}"
         print(f"Fetching list page: {url}")
-        soup = get_soup(url)
+        soup = get_soup(url, conditional=True)
         if not soup:
             print("No more pages, stopping scraper.")
             break
@@ -127,14 +141,16 @@ def fetch_articles(category_url, start_date, end_date, db_config, start_id=1):
 
         article_dates = []
 
+        links = []
         for a in articles:
             link = a.get("href")
-            if not link:
-                continue
+            if link and link not in links:
+                links.append(link)
 
-            article = scrape_article(link, id_counter)
+        for link, article in fetch_utils.map_articles(parse_article, links, headers=HEADERS, delay=1):
             if not article:
                 continue
+            article["id"] = id_counter
 
             # Parse article date
             try:
@@ -154,7 +170,7 @@ def fetch_articles(category_url, start_date, end_date, db_config, start_id=1):
             else:
                 print(f"Skipped (no date) : {article['title']}")
 
-            time.sleep(1)  # polite delay between articles
+        crawl_state.page_done(category_url, page, links[-1] if links else None)
 
         # After finishing the page, check the last article date
         if article_dates and min(article_dates) < start_date:
@@ -165,13 +181,11 @@ def fetch_articles(category_url, start_date, end_date, db_config, start_id=1):
     return id_counter
 
 
-def scrape_article(url, id_counter):
-    """Scrape one article and return standardized dict."""
-    soup = get_soup(url)
-    if not soup:
-        return None
-
+def parse_article(html, url):
+    """Parse one article page and return standardized dict."""
     try:
+        soup = BeautifulSoup(html, "html.parser")
+
         # --- Updated: get title from <h1 class="post-title"> ---
         title_tag = soup.find("h1", class_="post-title")
         title = title_tag.get_text(strip=True) if title_tag else ""
@@ -202,7 +216,6 @@ def scrape_article(url, id_counter):
             date_str = extract_date_from_url(url)
 
         return {
-            "id": id_counter,
             "date": date_str,
             "title": title,
             "contents": contents,
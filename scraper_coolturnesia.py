@@ -5,6 +5,10 @@ import mysql.connector
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+import fetch_utils
+import db_utils
+import crawl_state
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -15,9 +19,13 @@ HEADERS = {
 
 MAX_PAGES = 100
 
-def get_soup(url):
+def get_soup(url, conditional=False):
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
+        resp = fetch_utils.get(url, headers=HEADERS, timeout=10, conditional=conditional)
+        if resp.status_code == 304:
+            # List page unchanged since last cycle, nothing new further down either
+            print(f"⏭️ Not modified (304), stopping pagination: {url}")
+            return None
         resp.raise_for_status()
         return BeautifulSoup(resp.text, "html.parser")
     except requests.RequestException as e:
@@ -77,12 +85,10 @@ def parse_indonesian_date(date_str):
                     print(f"Could not parse date: {date_str}")
                     return None
 
-def scrape_article(url):
-    soup = get_soup(url)
-    if not soup:
-        return None
-
+def parse_article(html, url):
     try:
+        soup = BeautifulSoup(html, "html.parser")
+
         # Get title from breadcrumb or page title
         title = ""
         breadcrumb_title = soup.select_one("h2.page-title")
@@ -156,7 +162,7 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
     seen_links = set(existing_links)
     seen_titles = set(existing_titles)
 
-    for page in range(1, max_pages + 1):
+    for page in range(crawl_state.start_page(category_url), max_pages + 1):
         # Build pagination URL
         if page == 1:
             url = category_url
@@ -167,7 +173,7 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
 
         print(f"Fetching page {page}: {url}")
 
-        soup = get_soup(url)
+        soup = get_soup(url, conditional=True)
         if not soup:
             break
 
@@ -179,6 +185,7 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
 
         last_article_date = None
 
+        candidates = []
         for article in articles:
             # Get article link
             link_elem = article.select_one("a.post-title")
@@ -192,7 +199,7 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
             if not link.startswith("http"):
                 link = f"https://coolturnesia.com{link}"
 
-            if link in seen_links:
+            if link in seen_links and not fetch_utils.REPLAY:
                 print(f"Duplicate link: {link}")
                 continue
 
@@ -200,7 +207,7 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
             title_elem = article.select_one("a.post-title")
             title = title_elem.get_text(strip=True) if title_elem else ""
 
-            if title.strip().lower() in seen_titles:
+            if title.strip().lower() in seen_titles and not fetch_utils.REPLAY:
                 print(f"Duplicate title: {title}")
                 continue
 
@@ -214,8 +221,12 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
                 date_part = date_elem.get_text(strip=True)
                 date_str = f"{day}, {date_part}"
 
-            # Scrape full article
-            article_data = scrape_article(link)
+            if link not in (c[0] for c in candidates):
+                candidates.append((link, title, date_str))
+
+        # Scrape full articles (download + parse pipeline)
+        results = fetch_utils.map_articles(parse_article, [c[0] for c in candidates], headers=HEADERS, delay=2)
+        for (link, title, date_str), (_, article_data) in zip(candidates, results):
             if not article_data:
                 continue
 
@@ -239,6 +250,10 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
 
             if conn and cursor:
                 try:
+                    if fetch_utils.REPLAY and db_utils.update_replayed_article(cursor, article_data):
+                        conn.commit()
+                        print(f"Updated: {article_data['title']} ({article_data['date']})")
+                        continue
                     cursor.execute("""
                         INSERT IGNORE INTO news_articles
                         (date, title, contents, reporter, sources, links, impact, sector, sentiment)
@@ -265,7 +280,7 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
                 print(f"CONTENT : {article_data['contents'][:200]}...")
                 print("=" * 90)
 
-            time.sleep(2)  # Polite delay
+        crawl_state.page_done(category_url, page, candidates[-1][0] if candidates else None)
 
         if last_article_date and last_article_date < start_date:
             print(f"Stopping at page {page} because last article ({last_article_date}) is older than start_date ({start_date})")
@@ -5,15 +5,23 @@ from datetime import datetime
 import pymysql  # <-- ganti driver
 import re
 
+import fetch_utils
+import db_utils
+import crawl_state
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
 }
 
 MAX_PAGES = 1000
 
-def get_soup(url):
+def get_soup(url, conditional=False):
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
+        resp = fetch_utils.get(url, headers=HEADERS, timeout=10, conditional=conditional)
+        if resp.status_code == 304:
+            # List page unchanged since last cycle, nothing new further down either
+            print(f"⏭️ Not modified (304), stopping pagination: {url}")
+            return None
         resp.raise_for_status()
         return BeautifulSoup(resp.text, "html.parser")
     except requests.HTTPError as e:
@@ -34,12 +42,9 @@ def extract_date_from_url(url):
         return datetime(y, mth, d).date()
     return None
 
-def scrape_article(url):
-    soup = get_soup(url)
-    if not soup:
-        return None
-
+def parse_article(html, url):
     try:
+        soup = BeautifulSoup(html, "html.parser")
         title = soup.find("meta", property="og:title")["content"].strip()
         content_container = soup.select_one("div.content-inner")
         contents = ""
@@ -90,10 +95,10 @@ def fetch_articles(category_url, start_date, end_date, db_config):
     seen_links = set(existing_links)
     seen_titles = set(existing_titles)
 
-    for page in range(1, MAX_PAGES + 1):
+    for page in range(crawl_state.start_page(category_url), MAX_PAGES + 1):
         url = category_url if page == 1 else f"{category_url.rstrip('/')}/page/{page}/"
         print(f"Fetching page {page}: {url}")
-        soup = get_soup(url)
+        soup = get_soup(url, conditional=True)
         if not soup:
             break
 
@@ -104,18 +109,22 @@ def fetch_articles(category_url, start_date, end_date, db_config):
 
         last_article_date = None
 
+        links = []
         for a in articles:
             link = a.get("href")
             if not link:
                 continue
 
             # Skip duplicates by link
-            if link in seen_links:
+            if link in seen_links and not fetch_utils.REPLAY:
                 print(f"Duplicate link : {link}")
                 continue
 
-            # Scrape article only if not duplicate
-            article = scrape_article(link)
+            if link not in links:
+                links.append(link)
+
+        # Scrape articles only if not duplicate
+        for link, article in fetch_utils.map_articles(parse_article, links, headers=HEADERS, delay=1):
             if not article:
                 continue
 
@@ -131,7 +140,7 @@ def fetch_articles(category_url, start_date, end_date, db_config):
 
             # Skip duplicates by title
             title_key = article["title"].strip().lower()
-            if title_key in seen_titles:
+            if title_key in seen_titles and not fetch_utils.REPLAY:
                 print(f"Duplicate title: {article['title']}")
                 continue
 
@@ -142,6 +151,10 @@ def fetch_articles(category_url, start_date, end_date, db_config):
 
             # Save to DB
             try:
+                if fetch_utils.REPLAY and db_utils.update_replayed_article(cursor, article):
+                    conn.commit()
+                    print(f"Updated   : {article['title']} ({article['date']})")
+                    continue
                 cursor.execute("""
                     INSERT IGNORE INTO news_articles 
                     (date, title, contents, reporter, sources, links, impact) 
@@ -162,7 +175,7 @@ def fetch_articles(category_url, start_date, end_date, db_config):
             except Exception as e:
                 print(f"Failed to save article {link}: {e}")
 
-            time.sleep(1)
+        crawl_state.page_done(category_url, page, links[-1] if links else None)
 
         # Stop fetching next page if last article date on this page is older than start_date
         if last_article_date and last_article_date < start_date:
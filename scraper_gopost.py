@@ -5,6 +5,10 @@ import pymysql  # <-- ganti driver
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+import fetch_utils
+import db_utils
+import crawl_state
+
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
 MAX_PAGES = 1000
 
@@ -12,9 +16,13 @@ MAX_PAGES = 1000
 # ======================
 # UTILS
 # ======================
-def get_soup(url):
+def get_soup(url, conditional=False):
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        resp = fetch_utils.get(url, headers=HEADERS, timeout=15, conditional=conditional)
+        if resp.status_code == 304:
+            # List page unchanged since last cycle, nothing new further down either
+            print(f"⏭️ Not modified (304), stopping pagination: {url}")
+            return None
         resp.raise_for_status()
         return BeautifulSoup(resp.text, "html.parser")
     except Exception as e:
@@ -53,10 +61,9 @@ def title_exists(cursor, title):
 # ======================
 # ARTICLE SCRAPER
 # ======================
-def scrape_article(url, date_obj):
-    soup = get_soup(url)
-    if not soup:
-        return None
+def parse_article(html, url):
+    soup = BeautifulSoup(html, "html.parser")
+    date_obj = extract_date(url)
 
     # ---- TITLE ----
     title_tag = soup.find("h1", class_="jeg_post_title")
@@ -107,11 +114,11 @@ def fetch_articles(category_url, start_date, end_date, db_config):
     conn = pymysql.connect(**db_config)
     cursor = conn.cursor()
 
-    for page in range(1, MAX_PAGES + 1):
+    for page in range(crawl_state.start_page(category_url), MAX_PAGES + 1):
         url = category_url if page == 1 else f"{category_url.rstrip('/')}/page/{page}/"
         print(f"\n🔎 Fetching: {url}")
 
-        soup = get_soup(url)
+        soup = get_soup(url, conditional=True)
         if not soup:
             break
 
@@ -120,6 +127,8 @@ def fetch_articles(category_url, start_date, end_date, db_config):
             print("ℹ️ No more articles")
             break
 
+        links = []
+        reached_older = False
         for art in articles:
             a = art.select_one(".jeg_post_title a")
             if not a:
@@ -131,18 +140,24 @@ def fetch_articles(category_url, start_date, end_date, db_config):
                 continue
 
             if date_obj < start_date:
-                print("🛑 Stop pagination (older articles reached)")
-                cursor.close()
-                conn.close()
-                return
+                reached_older = True
+                break
 
             if date_obj > end_date:
                 continue
 
-            article = scrape_article(link, date_obj)
+            if link not in links:
+                links.append(link)
+
+        for link, article in fetch_utils.map_articles(parse_article, links, headers=HEADERS, timeout=15, delay=1):
             if not article:
                 continue
 
+            if fetch_utils.REPLAY and db_utils.update_replayed_article(cursor, article):
+                conn.commit()
+                print(f"🔁 Updated: {article['title']}")
+                continue
+
             # 🔴 DUPLICATE CHECK (CASE-SENSITIVE)
             if title_exists(cursor, article["title"]):
                 print(f"⏩ Duplicate skipped: {article['title']}")
@@ -166,7 +181,14 @@ def fetch_articles(category_url, start_date, end_date, db_config):
 
             conn.commit()
             print(f"✅ Inserted: {article['title']}")
-            time.sleep(1)
+
+        crawl_state.page_done(category_url, page, links[-1] if links else None)
+
+        if reached_older:
+            print("🛑 Stop pagination (older articles reached)")
+            cursor.close()
+            conn.close()
+            return
 
     cursor.close()
     conn.close()
\ No newline at end of file
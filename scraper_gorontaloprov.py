@@ -5,6 +5,10 @@ import pymysql  # <-- ganti driver
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+import fetch_utils
+import db_utils
+import crawl_state
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -13,9 +17,13 @@ HEADERS = {
     )
 }
 
-def get_soup(url):
+def get_soup(url, conditional=False):
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
+        resp = fetch_utils.get(url, headers=HEADERS, timeout=10, conditional=conditional)
+        if resp.status_code == 304:
+            # List page unchanged since last cycle, nothing new further down either
+            print(f"⏭️ Not modified (304), stopping pagination: {url}")
+            return None
         resp.raise_for_status()
         return BeautifulSoup(resp.text, "html.parser")
     except requests.RequestException as e:
@@ -39,31 +47,44 @@ def extract_reporter(contents):
         return m.group(1).strip()
     return "-"
 
-def fetch_articles(category_url, start_date, end_date, db_config, max_pages=50):
-    def extract_title(soup_art):
-        meta_title = soup_art.select_one('meta[property="og:title"]')
-        if meta_title and meta_title.get("content"):
-            return meta_title["content"].strip()
-        h1 = soup_art.select_one("h1.entry-title")
-        return h1.get_text(strip=True) if h1 else None
-
-    def extract_date(soup_art, url):
-        meta_date = soup_art.select_one('meta[property="article:published_time"]')
-        if meta_date and meta_date.get("content"):
-            return datetime.fromisoformat(meta_date["content"].split("T")[0]).date()
-        return extract_date_from_url(url)
+def extract_title(soup_art):
+    meta_title = soup_art.select_one('meta[property="og:title"]')
+    if meta_title and meta_title.get("content"):
+        return meta_title["content"].strip()
+    h1 = soup_art.select_one("h1.entry-title")
+    return h1.get_text(strip=True) if h1 else None
+
+def extract_date(soup_art, url):
+    meta_date = soup_art.select_one('meta[property="article:published_time"]')
+    if meta_date and meta_date.get("content"):
+        return datetime.fromisoformat(meta_date["content"].split("T")[0]).date()
+    return extract_date_from_url(url)
+
+def parse_article(html, url):
+    """Parse one article page; date comes from the URL when it has one."""
+    soup_art = BeautifulSoup(html, "html.parser")
+    date_val = extract_date_from_url(url) or extract_date(soup_art, url)
+    paras = soup_art.select("div.elementor-widget-theme-post-content p") \
+            or soup_art.select("article p")
+    content_texts = [p.get_text(strip=True) for p in paras if p.get_text(strip=True)]
+    return {
+        "date": date_val,
+        "title": extract_title(soup_art),
+        "contents": "\n".join(content_texts),
+    }
 
+def fetch_articles(category_url, start_date, end_date, db_config, max_pages=50):
     conn = pymysql.connect(**db_config)
     cursor = conn.cursor()
     cursor.execute("SELECT title FROM news_articles")
     db_titles = set(row[0] for row in cursor.fetchall())
     session_titles = set()
 
-    for page in range(1, max_pages + 1):
+    for page in range(crawl_state.start_page(category_url), max_pages + 1):
         url_page = category_url if page == 1 else f"{category_url}page/{page}/"
         print(f"Fetching page {page}: {url_page}")
 
-        soup = get_soup(url_page)
+        soup = get_soup(url_page, conditional=True)
         if not soup:
             break
 
@@ -75,20 +96,31 @@ def fetch_articles(category_url, start_date, end_date, db_config, max_pages=50):
         # Assume articles are sorted newest → oldest
         stop_category = False
 
+        urls = []
         for a in links:
             url = a.get("href")
             if not url:
                 continue
 
+            # If date cannot be parsed from URL, it is read from the article below
             date_val = extract_date_from_url(url)
-            # If date cannot be parsed from URL, fetch article to get it
-            soup_art = None
-            if not date_val:
-                soup_art = get_soup(url)
-                if not soup_art:
-                    continue
-                date_val = extract_date(soup_art, url)
+            if date_val and date_val < start_date:
+                print(f"Skipped   : {url} ({date_val}) — older than start_date")
+                stop_category = True
+                break  # stop processing links on this page
+
+            if date_val and date_val > end_date:
+                print(f"Skipped   : {url} ({date_val}) — after end_date")
+                continue
+
+            if url not in urls:
+                urls.append(url)
+
+        for url, article in fetch_utils.map_articles(parse_article, urls, headers=HEADERS, delay=1):
+            if not article:
+                continue
 
+            date_val = article["date"]
             if not date_val:
                 continue
 
@@ -101,27 +133,18 @@ def fetch_articles(category_url, start_date, end_date, db_config, max_pages=50):
                 print(f"Skipped   : {url} ({date_val}) — after end_date")
                 continue
 
-            # Fetch article HTML if not already fetched
-            if not soup_art:
-                soup_art = get_soup(url)
-                if not soup_art:
-                    continue
-
-            title = extract_title(soup_art)
+            title = article["title"]
             if not title:
                 continue
 
-            if title in db_titles or title in session_titles:
+            if (title in db_titles or title in session_titles) and not fetch_utils.REPLAY:
                 print(f"Duplicate : {title}")
                 continue
 
-            paras = soup_art.select("div.elementor-widget-theme-post-content p") \
-                    or soup_art.select("article p")
-            content_texts = [p.get_text(strip=True) for p in paras if p.get_text(strip=True)]
-            if not content_texts:
+            contents = article["contents"]
+            if not contents:
                 continue
 
-            contents = "\n".join(content_texts)
             reporter_name = extract_reporter(contents)
 
             row = {
@@ -137,6 +160,11 @@ def fetch_articles(category_url, start_date, end_date, db_config, max_pages=50):
             }
 
             try:
+                if fetch_utils.REPLAY and db_utils.update_replayed_article(cursor, row):
+                    conn.commit()
+                    session_titles.add(title)
+                    print(f"Updated   : {title} ({date_val})")
+                    continue
                 cursor.execute("""
                     INSERT INTO news_articles
                     (date, title, contents, reporter, sources, links, impact, sector, sentiment)
@@ -152,6 +180,8 @@ def fetch_articles(category_url, start_date, end_date, db_config, max_pages=50):
             except pymysql.IntegrityError:
                 print(f"Duplicate : {title} ({date_val})")
 
+        crawl_state.page_done(category_url, page, urls[-1] if urls else None)
+
         if stop_category:
             print("[INFO] Encountered article older than start_date, stopping category scraping.")
             break
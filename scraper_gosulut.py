@@ -5,6 +5,10 @@ import pymysql
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+import fetch_utils
+import db_utils
+import crawl_state
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
                   "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -14,10 +18,14 @@ HEADERS = {
 MAX_PAGES = 100
 
 
-def get_soup(url):
+def get_soup(url, conditional=False):
     """Fetch HTML and return BeautifulSoup object."""
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
+        resp = fetch_utils.get(url, headers=HEADERS, timeout=10, conditional=conditional)
+        if resp.status_code == 304:
+            # List page unchanged since last cycle, nothing new further down either
+            print(f"⏭️ Not modified (304), stopping pagination: {url}")
+            return None
         resp.raise_for_status()
         return BeautifulSoup(resp.text, "html.parser")
     except requests.HTTPError as e:
@@ -60,13 +68,10 @@ def extract_reporter(soup_art):
     return "Admin"
 
 
-def scrape_article(url):
-    """Scrape one article and return dict."""
-    soup = get_soup(url)
-    if not soup:
-        return None
-
+def parse_article(html, url):
+    """Parse one article page and return dict."""
     try:
+        soup = BeautifulSoup(html, "html.parser")
         title_tag = soup.select_one("h1.entry-title") or soup.select_one("h1")
         title = title_tag.get_text(strip=True) if title_tag else ""
         if not title:
@@ -144,11 +149,11 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
     seen_links = set(existing_links)
     seen_titles = set(existing_titles)
 
-    for page in range(1, max_pages + 1):
+    for page in range(crawl_state.start_page(category_url), max_pages + 1):
         url = category_url if page == 1 else f"{category_url.rstrip('/')}/page/{page}/"
         print(f"Fetching page {page}: {url}")
 
-        soup = get_soup(url)
+        soup = get_soup(url, conditional=True)
         if not soup:
             break
 
@@ -159,6 +164,7 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
 
         last_article_date = None
 
+        links = []
         for a in articles:
             link = a.get("href")
             if not link:
@@ -167,11 +173,14 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
             if not link.startswith("http"):
                 link = f"https://gosulut.id{link}"
 
-            if link in seen_links:
+            if link in seen_links and not fetch_utils.REPLAY:
                 print(f"Duplicate link: {link}")
                 continue
 
-            article = scrape_article(link)
+            if link not in links:
+                links.append(link)
+
+        for link, article in fetch_utils.map_articles(parse_article, links, headers=HEADERS, delay=1):
             if not article:
                 continue
 
@@ -184,7 +193,7 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
                     continue
 
             title_key = article["title"].strip().lower()
-            if title_key in seen_titles:
+            if title_key in seen_titles and not fetch_utils.REPLAY:
                 print(f"Duplicate title: {article['title']}")
                 continue
 
@@ -194,6 +203,10 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
 
             if cursor:
                 try:
+                    if fetch_utils.REPLAY and db_utils.update_replayed_article(cursor, article):
+                        conn.commit()
+                        print(f"Updated: {article['title']} ({article['date']})")
+                        continue
                     cursor.execute("""
                         INSERT IGNORE INTO news_articles
                         (date, title, contents, reporter, sources, links,
@@ -225,7 +238,7 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
                 print(f"CONTENT : {article['contents'][:200]}...")
                 print("=" * 90)
 
-            time.sleep(1)
+        crawl_state.page_done(category_url, page, links[-1] if links else None)
 
         if last_article_date and last_article_date < start_date:
             print(f"Stopping at page {page} because last article is older than start_date")
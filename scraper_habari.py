@@ -5,6 +5,10 @@ import pymysql
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+import fetch_utils
+import db_utils
+import crawl_state
+
 # ===============================
 # CONFIG
 # ===============================
@@ -18,9 +22,13 @@ MAX_PAGES = 100
 # ===============================
 # UTILS
 # ===============================
-def get_soup(url):
+def get_soup(url, conditional=False):
     try:
-        r = requests.get(url, headers=HEADERS, timeout=15)
+        r = fetch_utils.get(url, headers=HEADERS, timeout=15, conditional=conditional)
+        if r.status_code == 304:
+            # List page unchanged since last cycle, nothing new further down either
+            print(f"⏭️ Not modified (304), stopping pagination: {url}")
+            return None
         r.raise_for_status()
         return BeautifulSoup(r.text, "html.parser")
     except Exception as e:
@@ -43,10 +51,8 @@ def title_exists(cursor, title):
 # ===============================
 # SCRAPE DETAIL
 # ===============================
-def scrape_detail(url):
-    soup = get_soup(url)
-    if not soup:
-        return None
+def parse_detail(html, url):
+    soup = BeautifulSoup(html, "html.parser")
 
     # Judul
     h1 = soup.select_one("h1.entry-title")
@@ -110,11 +116,11 @@ def fetch_articles(category_url, start_date, end_date, db_config):
     conn = pymysql.connect(**db_config)
     cursor = conn.cursor()
 
-    for page in range(1, MAX_PAGES + 1):
+    for page in range(crawl_state.start_page(category_url), MAX_PAGES + 1):
         url = category_url if page == 1 else f"{category_url.rstrip('/')}/page/{page}/"
         print(f"\n🔎 Fetching index: {url}")
 
-        soup = get_soup(url)
+        soup = get_soup(url, conditional=True)
         if not soup:
             break
 
@@ -123,6 +129,8 @@ def fetch_articles(category_url, start_date, end_date, db_config):
             print("ℹ️ Tidak ada artikel di halaman ini")
             break
 
+        links = []
+        reached_older = False
         for art in articles:
             title_tag = art.select_one("h2.entry-title a")
             if not title_tag:
@@ -142,24 +150,31 @@ def fetch_articles(category_url, start_date, end_date, db_config):
 
             # Filter tanggal
             if date_obj < start_date:
-                print("🛑 Stop pagination (artikel lama tercapai)")
-                cursor.close()
-                conn.close()
-                return
+                reached_older = True
+                break
 
             if date_obj > end_date:
                 continue
 
-            if title_exists(cursor, title):
+            if title_exists(cursor, title) and not fetch_utils.REPLAY:
                 print(f"⏩ Skip duplikat: {title}")
                 continue
 
-            # Scrape detail
-            article = scrape_detail(link)
+            if link not in links:
+                links.append(link)
+
+        # Scrape detail (download + parse pipeline)
+        for link, article in fetch_utils.map_articles(parse_detail, links, headers=HEADERS, timeout=15, delay=1):
             if not article:
                 print("⚠️ Gagal scrape detail:", link)
                 continue
 
+            # Replay: update baris lama dengan hasil parse baru
+            if fetch_utils.REPLAY and db_utils.update_replayed_article(cursor, article):
+                conn.commit()
+                print(f"🔁 Updated: {article['title']} ({article['date']})")
+                continue
+
             # Insert DB
             cursor.execute("""
                 INSERT INTO news_articles
@@ -179,7 +194,14 @@ def fetch_articles(category_url, start_date, end_date, db_config):
 
             conn.commit()
             print(f"✅ Inserted: {article['title']} ({article['date']})")
-            time.sleep(1)
+
+        crawl_state.page_done(category_url, page, links[-1] if links else None)
+
+        if reached_older:
+            print("🛑 Stop pagination (artikel lama tercapai)")
+            cursor.close()
+            conn.close()
+            return
 
     cursor.close()
     conn.close()
@@ -5,6 +5,10 @@ import pymysql  # <-- ganti driver
 from datetime import datetime
 from bs4 import BeautifulSoup
 
+import fetch_utils
+import db_utils
+import crawl_state
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -13,10 +17,14 @@ HEADERS = {
     )
 }
 
-def get_soup(url):
+def get_soup(url, conditional=False):
     """Fetch HTML and return BeautifulSoup object."""
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
+        resp = fetch_utils.get(url, headers=HEADERS, timeout=10, conditional=conditional)
+        if resp.status_code == 304:
+            # List page unchanged since last cycle, nothing new further down either
+            print(f"⏭️ Not modified (304), stopping pagination: {url}")
+            return None
         resp.raise_for_status()
         return BeautifulSoup(resp.text, "html.parser")
     except requests.RequestException as e:
@@ -24,34 +32,51 @@ def get_soup(url):
         return None
 
 
-def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages=5):
-    """Scrape category pages and optionally save to DB."""
-    def extract_title(soup_art):
-        h1 = soup_art.select_one("h1.entry-title strong")
-        return h1.get_text(strip=True) if h1 else None
-
-    def extract_link(soup_art):
-        canonical = soup_art.select_one('link[rel="canonical"]')
-        return canonical.get("href") if canonical else None
-
-    def extract_date(soup_art):
-        meta_date = soup_art.select_one('meta[property="article:modified_time"]')
-        if meta_date and meta_date.get("content"):
-            return datetime.fromisoformat(meta_date["content"].split("T")[0]).date()
+def extract_title(soup_art):
+    h1 = soup_art.select_one("h1.entry-title strong")
+    return h1.get_text(strip=True) if h1 else None
+
+
+def extract_link(soup_art):
+    canonical = soup_art.select_one('link[rel="canonical"]')
+    return canonical.get("href") if canonical else None
+
+
+def extract_date(soup_art):
+    meta_date = soup_art.select_one('meta[property="article:modified_time"]')
+    if meta_date and meta_date.get("content"):
+        return datetime.fromisoformat(meta_date["content"].split("T")[0]).date()
+    return None
+
+
+def extract_reporter(soup_art):
+    meta_author = soup_art.select_one('meta[name="author"]')
+    return meta_author.get("content") if meta_author else "-"
+
+
+def extract_content(soup_art):
+    content_div = soup_art.select_one("div.entry-content.entry-content-single.clearfix")
+    if not content_div:
         return None
+    paragraphs = content_div.find_all("p")
+    texts = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
+    return "\n".join(texts)
 
-    def extract_reporter(soup_art):
-        meta_author = soup_art.select_one('meta[name="author"]')
-        return meta_author.get("content") if meta_author else "-"
 
-    def extract_content(soup_art):
-        content_div = soup_art.select_one("div.entry-content.entry-content-single.clearfix")
-        if not content_div:
-            return None
-        paragraphs = content_div.find_all("p")
-        texts = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
-        return "\n".join(texts)
+def parse_article(html, url):
+    """Parse one article page into its raw fields."""
+    soup_art = BeautifulSoup(html, "html.parser")
+    return {
+        "title": extract_title(soup_art),
+        "link": extract_link(soup_art),
+        "date": extract_date(soup_art),
+        "reporter": extract_reporter(soup_art),
+        "contents": extract_content(soup_art),
+    }
 
+
+def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages=5):
+    """Scrape category pages and optionally save to DB."""
     # Database connection if provided
     conn = None
     if db_config:
@@ -59,10 +84,10 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
 
     seen_links = set()  # In-memory deduplication for current run
 
-    for page in range(1, max_pages + 1):
+    for page in range(crawl_state.start_page(category_url), max_pages + 1):
         url_page = category_url if page == 1 else f"{category_url}page/{page}/"
         print(f"[INFO] Fetching page {page}: {url_page}")
-        soup = get_soup(url_page)
+        soup = get_soup(url_page, conditional=True)
         if not soup:
             break
 
@@ -72,21 +97,23 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
             break
 
         stop_fetching = False
+        article_urls = []
         for a in links:
             article_url = a.get("href")
             if not article_url or article_url in seen_links:
                 continue
             seen_links.add(article_url)
+            article_urls.append(article_url)
 
-            soup_art = get_soup(article_url)
-            if not soup_art:
+        for article_url, article in fetch_utils.map_articles(parse_article, article_urls, headers=HEADERS, delay=1):
+            if not article:
                 continue
 
-            title = extract_title(soup_art)
-            link = extract_link(soup_art)
-            date_val = extract_date(soup_art)
-            reporter = extract_reporter(soup_art)
-            contents = extract_content(soup_art)
+            title = article["title"]
+            link = article["link"]
+            date_val = article["date"]
+            reporter = article["reporter"]
+            contents = article["contents"]
 
             if not (title and link and date_val and contents):
                 continue
@@ -113,6 +140,12 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
                     try:
                         cursor = conn.cursor()
 
+                        if fetch_utils.REPLAY and db_utils.update_replayed_article(cursor, row):
+                            conn.commit()
+                            cursor.close()
+                            print(f"Updated: {title}")
+                            continue
+
                         # DB Pre-check for duplicates
                         cursor.execute("SELECT COUNT(*) FROM news_articles WHERE links = %s", (row["links"],))
                         exists = cursor.fetchone()[0] > 0
@@ -146,6 +179,8 @@ def fetch_articles(category_url, start_date, end_date, db_config=None, max_pages
             else:
                 print(f"Skipped: {title} ({date_val}) — after end_date")
 
+        crawl_state.page_done(category_url, page, article_urls[-1] if article_urls else None)
+
         if stop_fetching:
             print("[INFO] Older articles found, stopping further pages.")
             break
@@ -0,0 +1,175 @@
+"""
+Cross-check PDF newspaper pages against articles already scraped from the web.
+
+Many print articles (Gorontalo Post especially) are also published online
+and are already in news_articles. Before a PDF page goes to the LLM, each
+text region (see langchain_extract.group_text_regions) is compared with the
+same source's web articles from the days around the edition date:
+
+- every web article is broken into word 5-gram shingles (hashed with crc32)
+  and put in an inverted index shingle -> article ids
+- a region matches when at least MATCH_THRESHOLD of its shingles occur in
+  one web article (containment, since a region is usually only part of an
+  article, e.g. one column)
+
+Matched regions are removed from the LLM input and the web article is
+returned instead, linked by id. Short regions (headlines) are dropped too
+when their words are (nearly) the same as the title of a matched article.
+"""
+import re
+import zlib
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+
+import db_utils
+
+SHINGLE_SIZE = 5
+MATCH_THRESHOLD = 0.6     # share of region shingles found in one web article
+MIN_SHINGLES = 15         # shorter regions are not matched on their own
+TITLE_MATCH_RATIO = 0.8   # word-set Jaccard between a short region and a matched title
+TITLE_MIN_WORDS = 3       # shorter regions (kickers, place names) are never dropped as headlines
+WINDOW_DAYS = 3           # print edition of day D carries web articles from D-3 .. D
+INDEX_CACHE_ENTRIES = 16  # (source, date) indexes kept in memory
+
+# PDF source name (langchain_extract metadata) -> news_articles.sources
+WEB_SOURCE_NAMES = {
+    'Gorontalo Post': 'GorontaloPost',
+}
+
+
+def _words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def same_title(text, title):
+    """True when two texts have (nearly) the same set of words."""
+    a, b = set(_words(text)), set(_words(title))
+    if len(a) < TITLE_MIN_WORDS or not b:
+        return False
+    return len(a & b) / len(a | b) >= TITLE_MATCH_RATIO
+
+
+def shingles(text):
+    """Set of hashed word SHINGLE_SIZE-grams of text."""
+    words = _words(text)
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+class WebArticleIndex:
+    """Inverted shingle index over (id, title, contents, links) rows."""
+
+    def __init__(self, rows):
+        self.articles = {}
+        self.postings = {}
+        for article_id, title, contents, links in rows:
+            self.articles[article_id] = {"id": article_id, "title": title or "", "contents": contents or "", "links": links}
+            for shingle in shingles(f"{title or ''} {contents or ''}"):
+                self.postings.setdefault(shingle, []).append(article_id)
+
+    def __len__(self):
+        return len(self.articles)
+
+    def best_match(self, region_shingles):
+        """Return (article_id, containment) of the best web article for a region, or (None, 0)."""
+        hits = Counter()
+        for shingle in region_shingles:
+            hits.update(self.postings.get(shingle, ()))
+        if not hits:
+            return None, 0.0
+        article_id, count = hits.most_common(1)[0]
+        return article_id, count / len(region_shingles)
+
+
+class WebArticleMatcher:
+    """
+    Match PDF page regions against news_articles.
+
+    ``connect`` returns a DB-API connection (e.g. a pooled connection from
+    the dashboard); it is closed again after each index load.
+    """
+
+    def __init__(self, connect, window_days=WINDOW_DAYS, threshold=MATCH_THRESHOLD):
+        self.connect = connect
+        self.window_days = window_days
+        self.threshold = threshold
+        self._indexes = OrderedDict()
+        # The dashboard caches one extractor (and matcher) for all sessions, each running in its own thread
+        self._lock = threading.Lock()
+
+    def load_index(self, source, edition_date):
+        """WebArticleIndex for the source around edition_date (None when unavailable)."""
+        web_source = WEB_SOURCE_NAMES.get(source, source)
+        key = (web_source, edition_date)
+        with self._lock:
+            if key in self._indexes:
+                self._indexes.move_to_end(key)
+                return self._indexes[key]
+
+        conn = self.connect()
+        if not conn:
+            return None
+        try:
+            rows = db_utils.get_articles_for_matching(
+                conn, web_source, edition_date - timedelta(days=self.window_days), edition_date
+            )
+        finally:
+            conn.close()
+
+        index = WebArticleIndex(rows)
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > INDEX_CACHE_ENTRIES:
+                self._indexes.popitem(last=False)
+        return index
+
+    def match_pages(self, source, edition_date, pages):
+        """
+        Remove regions already published online.
+
+        ``pages`` is a list of region lists (one per page); ``edition_date``
+        an ISO date string or None. Returns (kept_pages, matches) where
+        matches holds one dict per web article (id, title, contents, links,
+        page = 0-based first page it was found on).
+        """
+        if source == 'unknown' or not edition_date:
+            return pages, []
+
+        try:
+            index = self.load_index(source, datetime.fromisoformat(edition_date).date())
+        except Exception as e:
+            print(f"[WARNING] Web article cross-check skipped: {e}")
+            return pages, []
+        if not index:
+            return pages, []
+
+        matches = OrderedDict()
+        kept_pages = []
+        short_regions = []
+        for page_num, regions in enumerate(pages):
+            kept = []
+            for region in regions:
+                region_shingles = shingles(region)
+                if len(region_shingles) >= MIN_SHINGLES:
+                    article_id, containment = index.best_match(region_shingles)
+                    if article_id is not None and containment >= self.threshold:
+                        if article_id not in matches:
+                            matches[article_id] = dict(index.articles[article_id], page=page_num)
+                        continue
+                else:
+                    short_regions.append((page_num, len(kept)))
+                kept.append(region)
+            kept_pages.append(kept)
+
+        # Headlines of matched articles are too short to match on their own
+        titles = [match["title"] for match in matches.values()]
+        for page_num, position in reversed(short_regions):
+            if any(same_title(kept_pages[page_num][position], title) for title in titles):
+                del kept_pages[page_num][position]
+
+        print(f"[INFO] Web cross-check: {len(matches)} articles already in news_articles "
+              f"({len(index)} web articles from {source})")
+        return kept_pages, list(matches.values())